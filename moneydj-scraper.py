@@ -31,59 +31,895 @@ This program scrapes ETF information from MoneyDJ financial website, including:
     data = scraper.get_all_data('VTI')
     print(data)
 
+非同步使用方式 (Async usage):
+    async with AsyncETFScraper(max_concurrency=50) as scraper:
+        data = await scraper.get_all_data('VTI')
+
+篩選使用方式 (Screening usage):
+    universe = scraper.compare_etfs(['00770.TW', 'QQQM'])['universe']
+    ETFScreener(universe).screen({'總管理費用(%)': (None, 0.5)}, sort_by='殖利率(%)',
+                                 ascending=False, top_k=10)
+
+持股異動追蹤 (Holdings change tracking):
+    tracker = HoldingsDiffTracker(scraper, 'holdings_events.jsonl', 'holdings_state')
+    events = tracker.update('VT')
+
+本機查詢服務 (Local query service):
+    python moneydj-scraper.py serve [port]
+    curl http://127.0.0.1:8000/basic_info/VT
+
+錄製與重播 (Record and replay):
+    ETFScraper(RecordingTransport('pages.jsonl.gz')).get_all_data('VT')
+    ETFScraper(ReplayTransport('pages.jsonl.gz', latency=0.05)).get_all_data('VT')
+    ETFScraper(SyntheticTransport(10000)).get_all_data('SYN00001')
+
+限制記憶體模式 (Memory-bounded mode):
+    scraper = ETFScraper(holdings_dir='holdings', chunk_size=1000, rss_budget_mb=1024)
+    handle = scraper.get_holdings('VT')['top_holdings']   # HoldingsHandle
+    for chunk in handle.iter_chunks():
+        ...
+    print(scraper.memory_report())
+
 需求套件 (Requirements):
     - requests
     - beautifulsoup4
     - pandas
+    - numpy
     - datetime
     - typing
+    - aiohttp (選用，AsyncETFScraper 使用) (Optional, used by AsyncETFScraper)
+    - psutil (選用，非 Linux 使用 rss_budget_mb 時) (Optional, for rss_budget_mb outside Linux)
 
 作者 (Author): Zi-Liang Yang
 版本 (Version): 1.0.0
 日期 (Date): 2024-11-04
 """
 
+import asyncio
+import json
+import gc
+import gzip
+import os
+import random
+import shutil
+import sys
+import threading
+import time
+import uuid
+import weakref
 import requests
 from bs4 import BeautifulSoup
 import pandas as pd
+import numpy as np
 import re
-from typing import Dict, List, Tuple, Union, Optional
-from datetime import datetime
+from typing import Dict, Iterator, List, Tuple, Union, Optional
+from datetime import date, datetime
+from collections import OrderedDict
+from concurrent.futures import Executor, Future
+from io import StringIO
+from html import escape
+from html.parser import HTMLParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlparse
+
+try:
+    import aiohttp
+except ImportError:  # 僅 AsyncETFScraper 需要 (Only required by AsyncETFScraper)
+    aiohttp = None
+
+try:
+    import resource
+except ImportError:  # Windows 無此模組 (Not available on Windows)
+    resource = None
+
+try:
+    import psutil
+except ImportError:  # 非 Linux 使用 rss_budget_mb 時需要 (Required for rss_budget_mb outside Linux)
+    psutil = None
+
+
+class Transport:
+    """
+    網頁傳輸層基底類別
+    Base Transport Class
+
+    ETFScraper 透過傳輸層取得網頁HTML，可替換為錄製、重播或合成資料的實作，
+    以便離線執行與壓力測試。
+    ETFScraper fetches page HTML through a transport, which can be swapped for
+    recording, replaying or synthetic implementations for offline runs and
+    load testing.
+    """
+
+    def fetch(self, url: str) -> str:
+        """
+        取得網頁HTML
+        Fetch page HTML
+
+        Args:
+            url (str): 目標網頁URL (Target webpage URL)
+
+        Returns:
+            str: 網頁HTML內容 (Webpage HTML content)
+        """
+        raise NotImplementedError
+
+    async def fetch_async(self, url: str) -> str:
+        """
+        非同步取得網頁HTML，預設在執行緒中呼叫 fetch，避免阻塞事件迴圈
+        Asynchronously fetch page HTML, by default running fetch in a thread
+        so it does not block the event loop
+
+        Args:
+            url (str): 目標網頁URL (Target webpage URL)
 
+        Returns:
+            str: 網頁HTML內容 (Webpage HTML content)
+        """
+        return await asyncio.to_thread(self.fetch, url)
 
-class ETFScraper:
+
+class HTTPTransport(Transport):
+    """
+    直接連線 MoneyDJ 的傳輸層
+    Transport that requests pages from MoneyDJ
     """
-    ETF資料爬蟲類別
-    ETF Data Scraper Class
 
-    用於抓取和處理ETF相關資訊的類別，提供多個方法來獲取不同類型的ETF數據。
-    A class for scraping and processing ETF-related information, providing multiple methods
-    to retrieve different types of ETF data.
+    DEFAULT_HEADERS = {
+        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+    }
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None):
+        """
+        Args:
+            headers (Optional[Dict[str, str]]): 請求標頭，預設為 DEFAULT_HEADERS (Request headers, DEFAULT_HEADERS by default)
+        """
+        self.headers = headers or dict(self.DEFAULT_HEADERS)
+
+    def fetch(self, url: str) -> str:
+        response = requests.get(url, headers=self.headers)
+        response.encoding = 'utf-8'
+        return response.text
+
+
+class RecordingTransport(Transport):
+    """
+    錄製傳輸層：轉送請求並將回應寫入壓縮封存檔
+    Recording Transport: forwards requests and appends responses to a compressed archive
+
+    封存檔為 gzip 壓縮的 JSON Lines，每行一筆 {url, fetched_at, html}，
+    可持續附加，並由 ReplayTransport 讀回。
+    The archive is gzip-compressed JSON Lines, one {url, fetched_at, html}
+    record per line. It can be appended to and is read back by ReplayTransport.
     """
 
-    def __init__(self):
+    def __init__(self, archive_path: str, inner: Optional[Transport] = None):
+        """
+        Args:
+            archive_path (str): 封存檔路徑 (Archive path)
+            inner (Optional[Transport]): 實際取得網頁的傳輸層，預設直接連線
+                                       Transport that does the fetching, live requests by default
+        """
+        self.archive_path = archive_path
+        self.inner = inner or HTTPTransport()
+        self._lock = threading.Lock()
+
+    def fetch(self, url: str) -> str:
+        html = self.inner.fetch(url)
+        self._append(url, html)
+        return html
+
+    async def fetch_async(self, url: str) -> str:
+        html = await self.inner.fetch_async(url)
+        await asyncio.to_thread(self._append, url, html)
+        return html
+
+    def _append(self, url: str, html: str) -> None:
         """
-        初始化爬蟲器，設置請求標頭
-        Initialize the scraper with request headers
+        將一筆回應附加到封存檔
+        Append one response to the archive
+
+        Args:
+            url (str): 網頁URL (Webpage URL)
+            html (str): 網頁HTML內容 (Webpage HTML content)
         """
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        record = {
+            'url': url,
+            'fetched_at': datetime.now().isoformat(timespec='seconds'),
+            'html': html
         }
+        with self._lock:
+            with gzip.open(self.archive_path, 'at', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
 
-    def _get_soup(self, url: str) -> BeautifulSoup:
+
+class SimulatedTransport(Transport):
+    """
+    模擬傳輸層基底類別，提供延遲與錯誤注入
+    Base class for simulated transports, adding latency and error injection
+    """
+
+    def __init__(self, latency: float = 0, jitter: float = 0, error_rate: float = 0,
+                 seed: Optional[int] = None):
         """
-        獲取網頁內容並返回BeautifulSoup對象
-        Get webpage content and return BeautifulSoup object
+        Args:
+            latency (float): 每個請求的平均延遲秒數 (Mean per-request latency in seconds)
+            jitter (float): 延遲的隨機變動範圍秒數 (Random +/- latency spread in seconds)
+            error_rate (float): 請求失敗的機率 (Probability that a request fails)
+            seed (Optional[int]): 亂數種子 (Random seed)
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+
+    def _render(self, url: str) -> str:
+        """
+        產生網址對應的HTML，由子類別實作
+        Produce the HTML for a URL, implemented by subclasses
+        """
+        raise NotImplementedError
+
+    def _next_delay(self, url: str) -> float:
+        """
+        決定本次延遲，並依錯誤率拋出連線錯誤
+        Pick this request's delay and raise a connection error at the error rate
+        """
+        if self.error_rate and self._random.random() < self.error_rate:
+            raise requests.exceptions.ConnectionError(f"Injected error for {url}")
+        return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+    def fetch(self, url: str) -> str:
+        delay = self._next_delay(url)
+        if delay:
+            time.sleep(delay)
+        return self._render(url)
+
+    async def fetch_async(self, url: str) -> str:
+        delay = self._next_delay(url)
+        if delay:
+            await asyncio.sleep(delay)
+        # 產生大型頁面可能耗時，不在事件迴圈上執行 (Rendering large pages can be slow, keep it off the loop)
+        return await asyncio.to_thread(self._render, url)
+
+
+class ReplayTransport(SimulatedTransport):
+    """
+    重播傳輸層：從 RecordingTransport 的封存檔於記憶體中提供回應
+    Replay Transport: serves responses from a RecordingTransport archive held in memory
 
+    同一網址錄製多次時使用最後一筆。
+    When a URL was recorded several times the last record wins.
+    """
+
+    def __init__(self, archive_path: str, **kwargs):
+        """
         Args:
-            url (str): 目標網頁URL (Target webpage URL)
+            archive_path (str): 封存檔路徑 (Archive path)
+            **kwargs: 延遲與錯誤注入參數，見 SimulatedTransport (Latency and error options, see SimulatedTransport)
+        """
+        super().__init__(**kwargs)
+        self._pages = {}
+        with gzip.open(archive_path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                record = json.loads(line)
+                self._pages[record['url']] = record['html']
+
+    @property
+    def urls(self) -> List[str]:
+        """封存檔中的網址 (URLs in the archive)"""
+        return list(self._pages)
+
+    def _render(self, url: str) -> str:
+        if url not in self._pages:
+            raise KeyError(f"URL not in archive: {url}")
+        return self._pages[url]
+
+
+class SyntheticTransport(SimulatedTransport):
+    """
+    合成傳輸層：為 N 個虛構ETF產生與 MoneyDJ 版面相同的頁面
+    Synthetic Transport: generates MoneyDJ-shaped pages for N fake ETFs
+
+    內容依ETF代碼與種子決定，重複請求得到相同結果。
+    Content is determined by the ETF code and seed, so repeated requests agree.
+
+    使用方式 (Usage):
+        transport = SyntheticTransport(10000, latency=0.05, error_rate=0.01)
+        scraper = AsyncETFScraper(max_concurrency=500, transport=transport)
+        result = await scraper.compare_etfs(transport.etf_codes)
+    """
+
+    def __init__(self, n_etfs: int, holdings_per_etf: int = 50, **kwargs):
+        """
+        Args:
+            n_etfs (int): 虛構ETF數量 (Number of fake ETFs)
+            holdings_per_etf (int): 每個ETF的持股筆數 (Number of holdings rows per ETF)
+            **kwargs: 延遲與錯誤注入參數，見 SimulatedTransport (Latency and error options, see SimulatedTransport)
+        """
+        super().__init__(**kwargs)
+        self.seed = kwargs.get('seed')
+        self.holdings_per_etf = holdings_per_etf
+        self.etf_codes = [f'SYN{i:05d}' for i in range(n_etfs)]
+        self._pages = {
+            urlparse(template).path.lower(): page
+            for page, template in ETFScraperBase.URLS.items()
+        }
+
+    def _render(self, url: str) -> str:
+        parsed = urlparse(url)
+        page = self._pages.get(parsed.path.lower())
+        etf_code = parse_qs(parsed.query).get('etfid', [''])[0]
+        if page is None or not etf_code:
+            raise KeyError(f"Unknown synthetic URL: {url}")
+
+        rng = random.Random(f'{self.seed}-{etf_code}-{page}')
+        return getattr(self, f'_render_{page}')(etf_code, rng)
+
+    @staticmethod
+    def _table(rows: List[List[str]], attrs: str, header: bool = True) -> str:
+        """
+        組合HTML表格，第一列為表頭
+        Build an HTML table whose first row is the header
+        """
+        html = [f'<table {attrs}>']
+        for i, row in enumerate(rows):
+            tag = 'th' if header and i == 0 else 'td'
+            html.append('<tr>' + ''.join(f'<{tag}>{cell}</{tag}>' for cell in row) + '</tr>')
+        html.append('</table>')
+        return ''.join(html)
+
+    def _render_basic_info(self, etf_code: str, rng: random.Random) -> str:
+        price = rng.uniform(10, 500)
+        rows = [
+            ['ETF名稱', f'合成ETF {etf_code}', '交易所代碼', etf_code],
+            ['英文名稱', f'Synthetic ETF {etf_code}', '發行公司', 'Synthetic Asset Management'],
+            ['成立日期', '2015/01/05（已成立10年）', 'ETF規模', f'{rng.uniform(10, 5000):,.2f}(百萬美元)'],
+            ['成交量(股)', f'{rng.randint(1000, 5000000):,}（2024/11/01）', 'ETF市價', f'{price:.2f} (2024/11/01)'],
+            ['ETF淨值', f'{price * rng.uniform(0.99, 1.01):.2f} (2024/11/01)', '折溢價(%)', f'{rng.uniform(-1, 1):.2f}(2024/11/01)'],
+            ['配息頻率', rng.choice(['月配', '季配', '半年配', '年配']), '總管理費用(%)', f'{rng.uniform(0.03, 1.2):.2f} (2024/10/31)'],
+            ['殖利率(%)', f'{rng.uniform(0, 8):.2f}（2024/10/31）', '年化標準差(%)', f'{rng.uniform(5, 35):.2f}（2024/10/31）']
+        ]
+        return self._table(rows, 'id="sTable"', header=False)
+
+    def _render_holdings(self, etf_code: str, rng: random.Random) -> str:
+        def distribution(names):
+            weights = [rng.random() for _ in names]
+            total = sum(weights)
+            return [
+                [str(i + 1), name, f'{w / total * 10000:,.2f}', f'{w / total * 100:.2f}']
+                for i, (name, w) in enumerate(zip(names, weights))
+            ]
+
+        regions = ['美國', '日本', '英國', '中國', '台灣', '德國', '法國', '其他']
+        sectors = ['資訊科技', '金融', '醫療保健', '工業', '非必需消費', '通訊服務', '能源', '原物料']
+        holdings = [
+            [f'Synthetic Corp {i:04d}', f'{rng.uniform(0.01, 5):.2f}', f'{rng.randint(100, 10000000):,}']
+            for i in range(self.holdings_per_etf)
+        ]
+        return ''.join([
+            '<div class="eTitle">持股狀況(依區域)</div>',
+            self._table([['#', '區域', '投資金額(萬美元)', '比例(%)']] + distribution(regions),
+                        'id="ctl00_ctl00_MainContent_MainContent_stable"'),
+            '<div class="eTitle">持股狀況(依產業)</div>',
+            self._table([['#', '產業', '投資金額(萬美元)', '比例(%)']] + distribution(sectors),
+                        'id="ctl00_ctl00_MainContent_MainContent_stable2"'),
+            '<div class="eTitle">持股明細</div>',
+            self._table([['個股名稱', '投資比例(%)', '持有股數']] + holdings,
+                        'id="ctl00_ctl00_MainContent_MainContent_stable3"')
+        ])
+
+    def _render_risk_analysis(self, etf_code: str, rng: random.Random) -> str:
+        rows = [['項目', '日期', '數值', '排名']]
+        for metric in ['追蹤誤差', '季均折溢價']:
+            total = rng.randint(100, 1000)
+            rows.append([metric, '2024/09/30', f'{rng.uniform(-2, 2):.2f}%',
+                         f'{rng.randint(1, total)}/{total}'])
+        return self._table(rows, 'class="DataTable"')
+
+    def _render_return_comparison(self, etf_code: str, rng: random.Random) -> str:
+        def ranks(n):
+            total = rng.randint(100, 1000)
+            return [f'{rng.randint(1, total)}/{total}' for _ in range(n)]
+
+        comparison = [
+            ['項目', '年化報酬率(%)', '年化標準差(%)', 'Sharpe', 'Beta'],
+            [etf_code] + [f'{rng.uniform(-10, 30):.2f}', f'{rng.uniform(5, 35):.2f}',
+                          f'{rng.uniform(-1, 2):.2f}', f'{rng.uniform(0.5, 1.5):.2f}'],
+            ['同類型平均'] + [f'{rng.uniform(-10, 30):.2f}' for _ in range(4)],
+            ['同類型排名'] + ranks(4)
+        ]
+        periods = ['今年起', '一個月', '三個月', '六個月', '一年', '二年', '三年']
+        monthly = [
+            ['項目'] + periods,
+            [etf_code] + [f'{rng.uniform(-20, 40):.2f}' for _ in periods],
+            ['同類型平均'] + [f'{rng.uniform(-20, 40):.2f}' for _ in periods],
+            ['同類型排名'] + ranks(len(periods))
+        ]
+        return self._table(comparison, 'class="datalist"') + self._table(monthly, 'class="datalist"')
+
+    def _render_return_trends(self, etf_code: str, rng: random.Random) -> str:
+        def trend(label, periods, table_id):
+            rows = [[label, '報酬率']] + [[p, f'{rng.uniform(-10, 10):.2f}%'] for p in periods]
+            return self._table(rows, f'id="{table_id}"')
+
+        return ''.join([
+            trend('月份', [f'2024/{m:02d}' for m in range(1, 13)], 'stable2'),
+            trend('季度', [f'2024Q{q}' for q in range(1, 5)], 'stable3'),
+            trend('年度', [str(y) for y in range(2015, 2025)], 'stable')
+        ])
+
+
+class MemoryBudgetExceeded(MemoryError):
+    """
+    行程記憶體超過 rss_budget_mb 時拋出
+    Raised when the process RSS exceeds rss_budget_mb
+    """
+
+
+class InvalidETFCode(ValueError):
+    """
+    ETF代碼無法安全地用於網址或檔案路徑時拋出
+    Raised when an ETF code cannot safely be used in a URL or file path
+    """
+
+
+def _current_rss_mb() -> Optional[float]:
+    """
+    目前的行程常駐記憶體(RSS, MB)，無法取得時返回None
+
+    rss_budget_mb 在所有平台都以此數值判斷：Linux 讀取 /proc/self/statm，
+    其他平台需安裝 psutil。此值會隨記憶體釋放而下降，不使用歷史最高值。
+    Current process resident set size (RSS) in MB, or None if unavailable.
+
+    rss_budget_mb is checked against this value on every platform. Linux reads
+    /proc/self/statm; other platforms need psutil. The value goes down when
+    memory is released; the historical peak is never used in its place.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 1024 ** 2
+    except (OSError, ValueError, AttributeError):
+        pass
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / 1024 ** 2
+    return None
+
+
+def _process_peak_rss_mb() -> Optional[float]:
+    """
+    作業系統回報的行程最高記憶體用量(MB)，無法取得時返回None
+    Process peak RSS in MB as reported by the OS, or None if unavailable
+
+    僅供回報，不用於判斷記憶體上限 (Reporting only, never used for the budget)
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS 以位元組計，Linux 以KB計 (Bytes on macOS, kilobytes on Linux)
+    return peak / 1024 ** 2 if sys.platform == 'darwin' else peak / 1024
+
+
+class _TopHoldingsStreamer(HTMLParser):
+    """
+    逐段解析持股頁面的HTML解析器
+    Incremental HTML parser for the holdings page
+
+    主要持股明細表的每一列在讀到時即取出儲存格文字，不建立網頁樹；
+    頁面其餘部分（區域、產業表與標題）另存為精簡的HTML，供原本的解析方法使用。
+    Each row of the top holdings table is turned into its cell texts as soon as
+    it is read, without building a tree. The rest of the page (region and sector
+    tables, titles) is kept as reduced HTML for the regular parsers.
+    """
+
+    def __init__(self, table_id: str):
+        """
+        Args:
+            table_id (str): 主要持股明細表的 id (id of the top holdings table)
+        """
+        super().__init__(convert_charrefs=True)
+        self.table_id = table_id
+        self.rows = []
+        self.titles = []
+        self._title = None
+        self._skeleton = []
+        self._table_depth = 0
+        self._row_index = 0
+        self._cells = None
+        self._cell = None
+
+    def skeleton(self) -> str:
+        """不含主要持股明細表的頁面HTML (Page HTML without the top holdings table)"""
+        return ''.join(self._skeleton)
+
+    def pop_rows(self) -> List[List[str]]:
+        """取出目前已解析完成的列 (Take the rows parsed so far)"""
+        rows, self.rows = self.rows, []
+        return rows
+
+    def _end_cell(self) -> None:
+        if self._cell is not None:
+            self._cells.append(''.join(self._cell).strip())
+            self._cell = None
+
+    def _end_row(self) -> None:
+        if self._cells is None:
+            return
+        self._end_cell()
+        # 跳過表頭列 (Skip the header row)
+        if self._row_index > 1:
+            self.rows.append(self._cells)
+        self._cells = None
+
+    def handle_starttag(self, tag, attrs):
+        if self._table_depth == 0:
+            if tag == 'table' and dict(attrs).get('id') == self.table_id:
+                self._table_depth = 1
+            else:
+                if tag == 'div' and 'eTitle' in (dict(attrs).get('class') or '').split():
+                    self._title = []
+                self._skeleton.append(self.get_starttag_text())
+            return
+
+        if tag == 'table':
+            self._table_depth += 1
+        elif tag == 'tr':
+            self._end_row()
+            self._row_index += 1
+            self._cells = []
+        elif tag == 'td' and self._cells is not None:
+            self._end_cell()
+            self._cell = []
+        elif tag == 'th':
+            self._end_cell()
+
+    def handle_startendtag(self, tag, attrs):
+        if self._table_depth == 0:
+            self._skeleton.append(self.get_starttag_text())
+
+    def handle_endtag(self, tag):
+        if self._table_depth == 0:
+            if tag == 'div' and self._title is not None:
+                self.titles.append(''.join(self._title).strip())
+                self._title = None
+            self._skeleton.append(f'</{tag}>')
+            return
+
+        if tag == 'table':
+            self._table_depth -= 1
+            if self._table_depth == 0:
+                self._end_row()
+        elif tag == 'tr':
+            self._end_row()
+        elif tag == 'td':
+            self._end_cell()
+
+    def handle_data(self, data):
+        if self._table_depth == 0:
+            if self._title is not None:
+                self._title.append(data)
+            self._skeleton.append(escape(data, quote=False))
+        elif self._cell is not None:
+            self._cell.append(data)
+
+
+class HoldingsHandle:
+    """
+    磁碟上的主要持股明細
+    On-disk Top Holdings
+
+    以欄式檔案保存於一個目錄：names.jsonl（每行一個JSON字串，名稱中的換行不會斷行）、
+    weights.f8 與 shares.f8（float64 原始陣列，以記憶體映射讀取），以及 meta.json。
+    資料只在呼叫 load 或 iter_chunks 時才讀入。
+    Stored column-wise in one directory: names.jsonl (one JSON string per line,
+    so line breaks inside names survive), weights.f8 and shares.f8 (raw float64
+    arrays read through memory maps) and meta.json. Data is only read on load
+    or iter_chunks.
+
+    每次寫入先在暫存目錄完成，再搬到新的版本目錄 <base_dir>/<時間>-<uuid>，
+    最後以 os.replace 更新 <base_dir>/CURRENT 指向它，因此既有的 handle 不會被覆寫，
+    沒有寫入任何資料時也不會建立 base_dir。指定 keep_versions 時會刪除較舊的版本，
+    但保留本行程中仍有 handle 使用的版本。
+    Every write is completed in a staging directory, moved to a new version
+    directory <base_dir>/<time>-<uuid>, and only then CURRENT is atomically
+    repointed at it with os.replace, so existing handles are never overwritten
+    and base_dir is not created when nothing was written. With keep_versions,
+    older versions are deleted unless a handle in this process still uses them.
+    """
+
+    columns = ['個股名稱', '投資比例(%)', '持有股數']
+
+    # 本行程中仍存在的 handle，刪除舊版本時略過 (Handles alive in this process, skipped when pruning)
+    _live = weakref.WeakSet()
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path (str): 持股資料目錄 (Holdings directory)
+        """
+        self.path = path
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self._live.add(self)
+
+    @classmethod
+    def current(cls, base_dir: str) -> Optional['HoldingsHandle']:
+        """
+        開啟 CURRENT 指向的最新版本
+        Open the latest version that CURRENT points to
+
+        Args:
+            base_dir (str): ETF的持股資料目錄 (Holdings directory of the ETF)
+
+        Returns:
+            Optional[HoldingsHandle]: 最新版本，尚未寫入過則返回None
+                                    Latest version, or None if nothing was written yet
+        """
+        pointer = os.path.join(base_dir, 'CURRENT')
+        if not os.path.exists(pointer):
+            return None
+        with open(pointer, encoding='utf-8') as f:
+            return cls(os.path.join(base_dir, f.read().strip()))
+
+    @classmethod
+    def write(cls, base_dir: str, rows: Iterator[Tuple[str, float, float]], chunk_size: int = 1000,
+              on_chunk=None, keep_versions: Optional[int] = None) -> Optional['HoldingsHandle']:
+        """
+        分段將持股列寫入新的版本目錄，完成後更新 CURRENT
+        Write holdings rows in chunks to a new version directory, then update CURRENT
+
+        Args:
+            base_dir (str): ETF的持股資料目錄 (Holdings directory of the ETF)
+            rows (Iterator[Tuple[str, float, float]]): (個股名稱, 投資比例(%), 持有股數) 列
+                                                      (name, weight(%), shares) rows
+            chunk_size (int): 每次寫出的筆數 (Rows written per chunk)
+            on_chunk: 每寫出一段後呼叫的函式 (Callable invoked after each chunk)
+            keep_versions (Optional[int]): 保留的版本數，None 則全部保留，見 prune
+                                         Versions to keep, None keeps all, see prune
+
+        Returns:
+            Optional[HoldingsHandle]: 寫入後的資料，若沒有任何列則返回None
+                                    Written data, or None if there were no rows
+        """
+        version = f"{datetime.now().strftime('%Y%m%d%H%M%S%f')}-{uuid.uuid4().hex}"
+        staging = f'{base_dir}.{uuid.uuid4().hex}.tmp'
+        os.makedirs(staging)
+        try:
+            count = cls._write_columns(staging, rows, chunk_size, on_chunk)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        if count == 0:
+            shutil.rmtree(staging, ignore_errors=True)
+            return None
+
+        with open(os.path.join(staging, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'rows': count, 'columns': cls.columns}, f, ensure_ascii=False)
+
+        path = os.path.join(base_dir, version)
+        os.makedirs(base_dir, exist_ok=True)
+        os.replace(staging, path)
+        pointer_tmp = os.path.join(base_dir, f'CURRENT.{uuid.uuid4().hex}.tmp')
+        with open(pointer_tmp, 'w', encoding='utf-8') as f:
+            f.write(version)
+        os.replace(pointer_tmp, os.path.join(base_dir, 'CURRENT'))
+        handle = cls(path)
+        if keep_versions:
+            cls.prune(base_dir, keep_versions)
+        return handle
+
+    @classmethod
+    def prune(cls, base_dir: str, keep_versions: int) -> None:
+        """
+        刪除舊版本，保留最新的 keep_versions 個、CURRENT 指向的版本，以及本行程中仍有 handle 的版本
+        Delete old versions, keeping the newest keep_versions, the one CURRENT
+        points to, and any still used by a handle in this process
+
+        其他行程持有的 handle 無法得知，共用 base_dir 時應設定足夠的 keep_versions。
+        Handles held by other processes are not visible, so allow enough
+        keep_versions when base_dir is shared.
+
+        Args:
+            base_dir (str): ETF的持股資料目錄 (Holdings directory of the ETF)
+            keep_versions (int): 保留的最新版本數 (Number of newest versions to keep)
+        """
+        current = cls.current(base_dir)
+        keep = {os.path.realpath(handle.path) for handle in list(cls._live)}
+        if current is not None:
+            keep.add(os.path.realpath(current.path))
+        versions = sorted(
+            name for name in os.listdir(base_dir)
+            if os.path.isdir(os.path.join(base_dir, name))
+        )
+        for name in versions[:-keep_versions]:
+            path = os.path.join(base_dir, name)
+            if os.path.realpath(path) not in keep:
+                shutil.rmtree(path, ignore_errors=True)
+
+    @staticmethod
+    def _write_columns(path: str, rows: Iterator[Tuple[str, float, float]], chunk_size: int,
+                       on_chunk=None) -> int:
+        """
+        分段寫出各欄檔案
+        Write the column files in chunks
+
+        Returns:
+            int: 寫出的筆數 (Number of rows written)
+        """
+        count = 0
+        names, weights, shares = [], [], []
+
+        with open(os.path.join(path, 'names.jsonl'), 'w', encoding='utf-8', newline='\n') as names_file, \
+                open(os.path.join(path, 'weights.f8'), 'wb') as weights_file, \
+                open(os.path.join(path, 'shares.f8'), 'wb') as shares_file:
+
+            def flush():
+                names_file.write(''.join(json.dumps(name, ensure_ascii=False) + '\n' for name in names))
+                np.asarray(weights, dtype='<f8').tofile(weights_file)
+                np.asarray(shares, dtype='<f8').tofile(shares_file)
+                names.clear()
+                weights.clear()
+                shares.clear()
+                if on_chunk is not None:
+                    on_chunk()
+
+            for name, weight, share in rows:
+                names.append(name)
+                weights.append(weight)
+                shares.append(share)
+                count += 1
+                if len(names) >= chunk_size:
+                    flush()
+            if names:
+                flush()
+
+        return count
+
+    def __len__(self) -> int:
+        return self.meta['rows']
+
+    def __repr__(self) -> str:
+        return f"HoldingsHandle({self.path!r}, rows={len(self)})"
+
+    @property
+    def empty(self) -> bool:
+        """是否沒有任何持股 (Whether there are no rows)"""
+        return len(self) == 0
+
+    @property
+    def weights(self) -> np.ndarray:
+        """投資比例(%)的記憶體映射 (Memory map of weight(%))"""
+        return np.memmap(os.path.join(self.path, 'weights.f8'), dtype='<f8', mode='r')
+
+    @property
+    def shares(self) -> np.ndarray:
+        """持有股數的記憶體映射 (Memory map of shares held)"""
+        return np.memmap(os.path.join(self.path, 'shares.f8'), dtype='<f8', mode='r')
+
+    def iter_chunks(self, chunk_size: int = 1000) -> Iterator[pd.DataFrame]:
+        """
+        分段讀取持股明細
+        Read top holdings in chunks
+
+        Args:
+            chunk_size (int): 每段筆數 (Rows per chunk)
+
+        Yields:
+            pd.DataFrame: 欄位同 get_holdings 的 top_holdings (Same columns as top_holdings)
+        """
+        weights, shares = self.weights, self.shares
+        with open(os.path.join(self.path, 'names.jsonl'), encoding='utf-8', newline='\n') as f:
+            for start in range(0, len(self), chunk_size):
+                names = [json.loads(f.readline()) for _ in range(min(chunk_size, len(self) - start))]
+                end = start + len(names)
+                yield pd.DataFrame({
+                    '個股名稱': names,
+                    '投資比例(%)': np.array(weights[start:end]),
+                    '持有股數': np.array(shares[start:end])
+                })
+
+    def load(self) -> pd.DataFrame:
+        """
+        將全部持股明細讀入記憶體
+        Load all top holdings into memory
+
+        Returns:
+            pd.DataFrame: 欄位同 get_holdings 的 top_holdings (Same columns as top_holdings)
+        """
+        chunks = list(self.iter_chunks(max(len(self), 1)))
+        return chunks[0] if chunks else pd.DataFrame(columns=self.columns)
+
+
+class ETFScraperBase:
+    """
+    ETF爬蟲共用基底類別
+    Shared base class of the ETF scrapers
+
+    包含網址、解析（_parse_*）與比較表建立等與抓取方式無關的邏輯，
+    由同步的 ETFScraper 與非同步的 AsyncETFScraper 共同繼承。
+    Holds the URLs, the parsing (_parse_*) and the comparison building that do
+    not depend on how pages are fetched; inherited by both the synchronous
+    ETFScraper and the asynchronous AsyncETFScraper.
+    """
+
+    # 各類資料對應的MoneyDJ頁面 (MoneyDJ page for each data type)
+    URLS = {
+        'basic_info': "https://www.moneydj.com/etf/x/basic/basic0004.xdjhtm?etfid={etf_code}",
+        'holdings': "https://www.moneydj.com/ETF/X/Basic/Basic0007.xdjhtm?etfid={etf_code}",
+        'risk_analysis': "https://www.moneydj.com/etf/x/Basic/Basic0013.xdjhtm?etfid={etf_code}",
+        'return_comparison': "https://www.moneydj.com/etf/x/Basic/Basic0010.xdjhtm?etfid={etf_code}",
+        'return_trends': "https://www.moneydj.com/etf/x/Basic/Basic0009.xdjhtm?etfid={etf_code}"
+    }
+
+    # 限制記憶體模式下每次送入解析器的字元數 (Characters fed to the parser at a time in memory-bounded mode)
+    STREAM_BLOCK_SIZE = 64 * 1024
+
+    def __init__(self, transport: Optional['Transport'] = None,
+                 holdings_dir: Optional[str] = None, chunk_size: int = 1000,
+                 rss_budget_mb: Optional[float] = None, keep_versions: Optional[int] = 2):
+        """
+        初始化爬蟲器，設置請求標頭與傳輸層
+        Initialize the scraper with request headers and transport
+
+        指定 holdings_dir 時啟用限制記憶體模式：主要持股明細以分段方式寫入
+        該目錄下每個ETF一個子目錄，結果中的 top_holdings 為延遲載入的 HoldingsHandle。
+        Setting holdings_dir enables the memory-bounded mode: top holdings rows are
+        written in chunks to one subdirectory per ETF, and top_holdings in the
+        result is a lazily loaded HoldingsHandle.
+
+        rss_budget_mb 以目前RSS判斷（見 _current_rss_mb），於每次取得網頁、建立網頁樹
+        與寫出每段持股後檢查。
+        rss_budget_mb is checked against the current RSS (see _current_rss_mb)
+        after every page fetch, every soup build and every holdings chunk.
+
+        Args:
+            transport (Optional[Transport]): 取得網頁的傳輸層，預設直接連線 MoneyDJ
+                                           Transport used to fetch pages, defaults to live MoneyDJ requests
+            holdings_dir (Optional[str]): 主要持股明細的輸出目錄 (Output directory for top holdings)
+            chunk_size (int): 每次寫出的持股筆數 (Holdings rows written per chunk)
+            rss_budget_mb (Optional[float]): 行程記憶體上限(MB)，超過時拋出 MemoryBudgetExceeded
+                                           Process RSS budget in MB, MemoryBudgetExceeded is raised above it
+            keep_versions (Optional[int]): 每個ETF保留的持股版本數，None 則全部保留
+                                         Holdings versions kept per ETF, None keeps all
+        """
+        self.headers = dict(HTTPTransport.DEFAULT_HEADERS)
+        self.transport = transport or HTTPTransport(self.headers)
+        self.holdings_dir = holdings_dir
+        self.chunk_size = chunk_size
+        self.rss_budget_mb = rss_budget_mb
+        self.keep_versions = keep_versions
+        self.peak_rss_mb = None
+        if rss_budget_mb and _current_rss_mb() is None:
+            raise ImportError("rss_budget_mb requires psutil on this platform: pip install psutil")
+
+    def _build_url(self, page: str, etf_code: str) -> str:
+        """
+        組合指定頁面的網址，ETF代碼會經過網址編碼
+        Build the URL of the given page, URL-encoding the ETF code
+
+        Args:
+            page (str): 頁面名稱，須為 URLS 的鍵 (Page name, a key of URLS)
+            etf_code (str): ETF代碼 (ETF code)
+
+        Returns:
+            str: 目標網頁URL (Target webpage URL)
+        """
+        return self.URLS[page].format(etf_code=quote(etf_code, safe=''))
+
+    def _make_soup(self, html: str) -> BeautifulSoup:
+        """
+        將HTML文字轉為BeautifulSoup對象
+        Turn HTML text into a BeautifulSoup object
+
+        Args:
+            html (str): 網頁HTML內容 (Webpage HTML content)
 
         Returns:
             BeautifulSoup: 解析後的HTML內容 (Parsed HTML content)
         """
-        response = requests.get(url, headers=self.headers)
-        response.encoding = 'utf-8'
-        return BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(html, 'html.parser')
+        self._check_memory()
+        return soup
 
     def _parse_ranking(self, text: str) -> Union[Tuple[Optional[int], Optional[int]], str]:
         """
@@ -164,37 +1000,17 @@ class ETFScraper:
         except (ValueError, AttributeError):
             return None
 
-    def get_basic_info(self, etf_code: str) -> Dict:
+    def _parse_basic_info(self, soup: BeautifulSoup) -> Dict:
         """
-        獲取ETF基本資訊
-        Get ETF basic information
-
-        抓取ETF的基本資料，包括名稱、代碼、規模、費用等
-        Scrape basic ETF data including name, code, size, fees, etc.
+        解析基本資訊頁面
+        Parse the basic information page
 
         Args:
-            etf_code (str): ETF代碼 (ETF code)
+            soup (BeautifulSoup): 網頁解析對象 (Parsed webpage object)
 
         Returns:
-            Dict: 包含以下欄位的字典 (Dictionary containing following fields):
-                - ETF名稱 (ETF name)
-                - 交易所代碼 (Exchange code)
-                - 英文名稱 (English name)
-                - 發行公司 (Issuer)
-                - 成立日期 (Inception date)
-                - ETF規模 (ETF size)
-                - 成交量 (Trading volume)
-                - ETF市價 (ETF price)
-                - ETF淨值 (ETF NAV)
-                - 折溢價(%) (Premium/Discount(%))
-                - 配息頻率 (Distribution frequency)
-                - 總管理費用(%) (Total expense ratio(%))
-                - 殖利率(%) (Yield(%))
-                - 年化標準差(%) (Annualized standard deviation(%))
+            Dict: 基本資訊字典，欄位同 get_basic_info (Basic info, same fields as get_basic_info)
         """
-        url = f"https://www.moneydj.com/etf/x/basic/basic0004.xdjhtm?etfid={etf_code}"
-        soup = self._get_soup(url)
-
         table = soup.find('table', {'id': 'sTable'})
         if not table:
             return {}
@@ -232,30 +1048,17 @@ class ETFScraper:
 
         return result
 
-    def get_holdings(self, etf_code: str) -> Dict[str, Optional[pd.DataFrame]]:
+    def _parse_holdings(self, soup: BeautifulSoup) -> Dict[str, Optional[pd.DataFrame]]:
         """
-        獲取ETF的全部持股資訊
-        Get all holdings information of the ETF
-
-        抓取三種持股相關資訊：
-        Scrape three types of holdings information:
-        1. 依區域的持股分布 (Holdings distribution by region)
-        2. 依產業的持股分布 (Holdings distribution by sector)
-        3. 主要持股明細 (Top holdings details)
+        解析持股資訊頁面
+        Parse the holdings page
 
         Args:
-            etf_code (str): ETF代碼 (ETF code)
+            soup (BeautifulSoup): 網頁解析對象 (Parsed webpage object)
 
         Returns:
-            Dict[str, Optional[pd.DataFrame]]: 包含三個DataFrame的字典
-                                             Dictionary containing three DataFrames:
-                - holdings_by_region: 依區域分布 (Distribution by region)
-                - holdings_by_sector: 依產業分布 (Distribution by sector)
-                - top_holdings: 主要持股明細 (Top holdings details)
+            Dict[str, Optional[pd.DataFrame]]: 欄位同 get_holdings (Same keys as get_holdings)
         """
-        url = f"https://www.moneydj.com/ETF/X/Basic/Basic0007.xdjhtm?etfid={etf_code}"
-        soup = self._get_soup(url)
-
         titles = soup.find_all('div', {'class': 'eTitle'})
         title_texts = [title.text.strip() for title in titles]
 
@@ -368,55 +1171,183 @@ class ETFScraper:
             if not holdings_table:
                 return None
 
-            data = []
-            for row in holdings_table.find_all('tr')[1:]:
-                cols = row.find_all('td')
-                if len(cols) >= 3:
-                    data.append({
-                        '個股名稱': cols[0].text.strip(),
-                        '投資比例(%)': float(cols[1].text.strip()),
-                        '持有股數': float(cols[2].text.strip().replace(',', ''))
-                    })
+            data = [
+                {'個股名稱': name, '投資比例(%)': weight, '持有股數': shares}
+                for name, weight, shares in self._iter_top_holdings(holdings_table)
+            ]
 
             return pd.DataFrame(data)
         except Exception as e:
             print(f"Error in get_top_holdings: {e}")
             return None
 
-    def get_risk_analysis(self, etf_code: str) -> Dict:
+    def _iter_top_holdings(self, holdings_table) -> Iterator[Tuple[str, float, float]]:
         """
-        獲取風險分析數據
-        Get risk analysis data
+        逐列解析主要持股明細
+        Parse top holdings one row at a time
 
-        抓取ETF的風險指標，包括追蹤誤差和季均折溢價等
-        Scrape ETF risk indicators including tracking error and quarterly premium/discount
+        Args:
+            holdings_table: 主要持股明細表格 (Top holdings table tag)
+
+        Yields:
+            Tuple[str, float, float]: (個股名稱, 投資比例(%), 持有股數) ((name, weight(%), shares))
+        """
+        for row in holdings_table.find_all('tr')[1:]:
+            cols = row.find_all('td')
+            if len(cols) >= 3:
+                yield self._top_holdings_row([col.text.strip() for col in cols])
+
+    def _top_holdings_row(self, cells: List[str]) -> Tuple[str, float, float]:
+        """
+        將一列主要持股明細的儲存格文字轉為數值
+        Convert the cell texts of one top holdings row
 
         Args:
-            etf_code (str): ETF代碼 (ETF code)
+            cells (List[str]): 儲存格文字 (Cell texts)
 
         Returns:
-            Dict: 包含以下風險指標的字典 (Dictionary containing following risk indicators):
-                - 日期 (date)
-                - 數值 (value)
-                - 排名 (rank)
-                - 總數 (total)
+            Tuple[str, float, float]: (個股名稱, 投資比例(%), 持有股數) ((name, weight(%), shares))
         """
-        url = f"https://www.moneydj.com/etf/x/Basic/Basic0013.xdjhtm?etfid={etf_code}"
-        soup = self._get_soup(url)
+        return cells[0], float(cells[1]), float(cells[2].replace(',', ''))
 
-        table = soup.find('table', {'class': 'DataTable'})
-        if not table:
-            return {}
+    def _holdings_path(self, etf_code: str) -> str:
+        """
+        ETF在 holdings_dir 下的目錄，拒絕可能跳出該目錄的代碼
+        Directory of the ETF under holdings_dir, rejecting codes that could escape it
 
-        data = {}
-        rows = table.find_all('tr')[1:]  # 跳過表頭 (Skip header)
+        Args:
+            etf_code (str): ETF代碼 (ETF code)
 
-        for row in rows:
-            cols = row.find_all(['th', 'td'])
-            if len(cols) >= 4:
-                metric = cols[0].text.strip()
-                date = cols[1].text.strip()
-                value = self._parse_percentage(cols[2].text)
+        Returns:
+            str: 持股資料目錄 (Holdings directory)
+        """
+        name = re.sub(r'[^\w.-]', '_', etf_code)
+        root = os.path.realpath(self.holdings_dir)
+        path = os.path.realpath(os.path.join(root, name))
+        if name in ('', '.', '..') or os.path.dirname(path) != root:
+            raise InvalidETFCode(f"Invalid ETF code: {etf_code!r}")
+        return path
+
+    def _stream_holdings(self, html: str,
+                         base_dir: str) -> Dict[str, Optional[Union[pd.DataFrame, HoldingsHandle]]]:
+        """
+        以逐段解析處理持股頁面：主要持股明細邊讀邊分段寫入磁碟，不建立整頁的網頁樹
+        Parse the holdings page incrementally: top holdings rows are written to disk
+        in chunks as they are read, and no tree is built for the whole page
+
+        Args:
+            html (str): 持股頁面HTML (Holdings page HTML)
+            base_dir (str): ETF的持股資料目錄，見 _holdings_path (Holdings directory of the ETF, see _holdings_path)
+
+        Returns:
+            Dict[str, Optional[Union[pd.DataFrame, HoldingsHandle]]]:
+                欄位同 get_holdings，top_holdings 為 HoldingsHandle
+                Same keys as get_holdings, top_holdings is a HoldingsHandle
+        """
+        streamer = _TopHoldingsStreamer('ctl00_ctl00_MainContent_MainContent_stable3')
+        position = 0
+
+        def feed_next() -> None:
+            nonlocal position
+            streamer.feed(html[position:position + self.STREAM_BLOCK_SIZE])
+            position += self.STREAM_BLOCK_SIZE
+
+        def rows() -> Iterator[Tuple[str, float, float]]:
+            while position < len(html):
+                feed_next()
+                # 與 _parse_holdings 相同，只有出現「持股明細」標題時才取用該表
+                # (As in _parse_holdings, the table is only used under a 持股明細 title)
+                if not any('持股明細' in title for title in streamer.titles):
+                    streamer.pop_rows()
+                    continue
+                for cells in streamer.pop_rows():
+                    if len(cells) >= 3:
+                        yield self._top_holdings_row(cells)
+
+        try:
+            handle = HoldingsHandle.write(base_dir, rows(), self.chunk_size,
+                                          on_chunk=self._check_memory,
+                                          keep_versions=self.keep_versions)
+        except MemoryBudgetExceeded:
+            raise
+        except Exception as e:
+            print(f"Error in get_top_holdings: {e}")
+            handle = None
+
+        # 讀完剩餘部分以取得完整的頁面骨架 (Finish reading to complete the page skeleton)
+        while position < len(html):
+            feed_next()
+            streamer.pop_rows()
+        streamer.close()
+
+        result = self._parse_holdings(self._make_soup(streamer.skeleton()))
+        if handle is not None:
+            result['top_holdings'] = handle
+        return result
+
+    def _check_memory(self) -> None:
+        """
+        記錄目前的行程RSS，超過上限時拋出 MemoryBudgetExceeded（RSS定義見 _current_rss_mb）
+        Record the current process RSS and raise MemoryBudgetExceeded above the budget
+        (see _current_rss_mb for how RSS is measured)
+        """
+        rss = _current_rss_mb()
+        if rss is None:
+            return
+        self.peak_rss_mb = max(self.peak_rss_mb or 0.0, rss)
+        if self.rss_budget_mb and rss > self.rss_budget_mb:
+            gc.collect()
+            rss = _current_rss_mb()
+            if rss > self.rss_budget_mb:
+                raise MemoryBudgetExceeded(
+                    f"RSS {rss:.1f} MB exceeds budget {self.rss_budget_mb:.1f} MB")
+
+    def memory_report(self) -> Dict[str, Optional[float]]:
+        """
+        回報記憶體使用狀況
+        Report memory usage
+
+        Returns:
+            Dict[str, Optional[float]]: 單位皆為MB (All values in MB):
+                - budget_mb: 設定的上限 (Configured budget)
+                - current_rss_mb: 目前用量 (Current RSS)
+                - peak_rss_mb: 檢查時觀察到的最高用量 (Highest RSS seen at checks)
+                - process_peak_rss_mb: 作業系統回報的行程最高用量 (Process peak RSS reported by the OS)
+        """
+        rss = _current_rss_mb()
+        if rss is not None:
+            self.peak_rss_mb = max(self.peak_rss_mb or 0.0, rss)
+        return {
+            'budget_mb': self.rss_budget_mb,
+            'current_rss_mb': rss,
+            'peak_rss_mb': self.peak_rss_mb,
+            'process_peak_rss_mb': _process_peak_rss_mb()
+        }
+
+    def _parse_risk_analysis(self, soup: BeautifulSoup) -> Dict:
+        """
+        解析風險分析頁面
+        Parse the risk analysis page
+
+        Args:
+            soup (BeautifulSoup): 網頁解析對象 (Parsed webpage object)
+
+        Returns:
+            Dict: 風險指標字典，格式同 get_risk_analysis (Same format as get_risk_analysis)
+        """
+        table = soup.find('table', {'class': 'DataTable'})
+        if not table:
+            return {}
+
+        data = {}
+        rows = table.find_all('tr')[1:]  # 跳過表頭 (Skip header)
+
+        for row in rows:
+            cols = row.find_all(['th', 'td'])
+            if len(cols) >= 4:
+                metric = cols[0].text.strip()
+                date = cols[1].text.strip()
+                value = self._parse_percentage(cols[2].text)
 
                 try:
                     rank, total = self._parse_ranking(cols[3].text)
@@ -435,26 +1366,17 @@ class ETFScraper:
 
         return data
 
-    def get_return_comparison(self, etf_code: str) -> Dict[str, pd.DataFrame]:
+    def _parse_return_comparison(self, soup: BeautifulSoup) -> Dict[str, pd.DataFrame]:
         """
-        獲取報酬比較數據
-        Get return comparison data
-
-        抓取ETF與同類型ETF的報酬率比較數據
-        Scrape return comparison data between the ETF and similar ETFs
+        解析報酬比較頁面
+        Parse the return comparison page
 
         Args:
-            etf_code (str): ETF代碼 (ETF code)
+            soup (BeautifulSoup): 網頁解析對象 (Parsed webpage object)
 
         Returns:
-            Dict[str, pd.DataFrame]: 包含兩個DataFrame的字典 
-                                   Dictionary containing two DataFrames:
-                - comparison: 報酬率比較表 (Return comparison table)
-                - monthly: 月份報酬比較表 (Monthly return comparison table)
+            Dict[str, pd.DataFrame]: 欄位同 get_return_comparison (Same keys as get_return_comparison)
         """
-        url = f"https://www.moneydj.com/etf/x/Basic/Basic0010.xdjhtm?etfid={etf_code}"
-        soup = self._get_soup(url)
-
         tables = soup.find_all('table', {'class': 'datalist'})
         result = {}
 
@@ -510,27 +1432,17 @@ class ETFScraper:
 
         return result
 
-    def get_return_trends(self, etf_code: str) -> Dict[str, pd.DataFrame]:
+    def _parse_return_trends(self, soup: BeautifulSoup) -> Dict[str, pd.DataFrame]:
         """
-        獲取報酬走勢數據
-        Get return trend data
-
-        抓取ETF的月度、季度和年度報酬率數據
-        Scrape monthly, quarterly, and yearly return data of the ETF
+        解析報酬走勢頁面
+        Parse the return trends page
 
         Args:
-            etf_code (str): ETF代碼 (ETF code)
+            soup (BeautifulSoup): 網頁解析對象 (Parsed webpage object)
 
         Returns:
-            Dict[str, pd.DataFrame]: 包含三個DataFrame的字典 
-                                   Dictionary containing three DataFrames:
-                - monthly_return: 月報酬率 (Monthly returns)
-                - quarterly_return: 季報酬率 (Quarterly returns)
-                - yearly_return: 年報酬率 (Yearly returns)
+            Dict[str, pd.DataFrame]: 欄位同 get_return_trends (Same keys as get_return_trends)
         """
-        url = f"https://www.moneydj.com/etf/x/Basic/Basic0009.xdjhtm?etfid={etf_code}"
-        soup = self._get_soup(url)
-
         result = {}
 
         tables = {
@@ -542,7 +1454,7 @@ class ETFScraper:
         for period, table_id in tables.items():
             table = soup.find('table', {'id': table_id})
             if table:
-                df = pd.read_html(str(table))[0]
+                df = pd.read_html(StringIO(str(table)))[0]
                 # 處理數值列 (Process numeric columns)
                 for col in df.columns[1:]:
                     df[col] = df[col].apply(self._parse_percentage)
@@ -550,33 +1462,6 @@ class ETFScraper:
 
         return result
 
-    def get_all_data(self, etf_code: str) -> Dict:
-        """
-        獲取ETF的所有數據
-        Get all data for the ETF
-
-        整合所有ETF相關資訊的主要方法
-        Main method to integrate all ETF-related information
-
-        Args:
-            etf_code (str): ETF代碼 (ETF code)
-
-        Returns:
-            Dict: 包含所有ETF資訊的字典 (Dictionary containing all ETF information):
-                - basic_info: 基本資訊 (Basic information)
-                - holdings: 持股資訊 (Holdings information)
-                - risk_analysis: 風險分析 (Risk analysis)
-                - return_comparison: 報酬比較 (Return comparison)
-                - return_trends: 報酬走勢 (Return trends)
-        """
-        return {
-            'basic_info': self.get_basic_info(etf_code),
-            'holdings': self.get_holdings(etf_code),
-            'risk_analysis': self.get_risk_analysis(etf_code),
-            'return_comparison': self.get_return_comparison(etf_code),
-            'return_trends': self.get_return_trends(etf_code)
-        }
-
     def _parse_price(self, text: str) -> Optional[float]:
         """
         解析價格值（去除日期等額外資訊）
@@ -599,35 +1484,18 @@ class ETFScraper:
         except (ValueError, AttributeError):
             return None
 
-    def compare_etfs(self, etf_codes: List[str]) -> Dict[str, pd.DataFrame]:
+    def _build_comparison(self, all_data: Dict[str, Dict]) -> Dict[str, pd.DataFrame]:
         """
-        比較多個ETF的關鍵指標
-        Compare key indicators of multiple ETFs
+        由各ETF的完整資料建立比較表
+        Build comparison tables from the full data of each ETF
 
         Args:
-            etf_codes (List[str]): ETF代碼列表，例如 ['00770.TW', '00830.TW', 'QQQM']
-                                List of ETF codes, e.g., ['00770.TW', '00830.TW', 'QQQM']
+            all_data (Dict[str, Dict]): ETF代碼對應 get_all_data 結果的字典
+                                      Mapping of ETF code to get_all_data result
 
         Returns:
-            Dict[str, pd.DataFrame]: 包含以下比較表的字典 Dictionary containing following comparison tables:
-                - basic_metrics: 基本指標比較 (Basic metrics comparison)
-                - returns: 報酬率比較 (Return comparison)
-                - peer_comparison: 同類型比較 (Peer comparison)
+            Dict[str, pd.DataFrame]: 欄位同 compare_etfs (Same keys as compare_etfs)
         """
-        # 儲存所有ETF的資料
-        all_data = {}
-        for etf_code in etf_codes:
-            try:
-                data = self.get_all_data(etf_code)
-                # 確保基本資訊存在
-                if 'basic_info' not in data:
-                    print(f"No basic info for {etf_code}")
-                    continue
-                all_data[etf_code] = data
-            except Exception as e:
-                print(f"Error getting data for {etf_code}: {e}")
-                continue
-
         # 1. 基本指標比較表
         basic_metrics_data = []
         for etf_code, data in all_data.items():
@@ -710,61 +1578,1346 @@ class ETFScraper:
         return {
             'basic_metrics': basic_metrics_df,
             'returns': returns_df,
-            'peer_comparison': peer_comparison_df
+            'peer_comparison': peer_comparison_df,
+            'universe': self._build_universe(all_data, basic_metrics_df)
         }
 
+    def _build_universe(self, all_data: Dict[str, Dict],
+                        basic_metrics_df: pd.DataFrame) -> pd.DataFrame:
+        """
+        建立供篩選使用的ETF總表（每個ETF一列，全部為數值欄位）
+        Build the screening universe table (one row per ETF, numeric columns)
 
-# # 使用範例 (Usage Example)
-# if __name__ == "__main__":
-#     # 建立爬蟲器實例 (Create scraper instance)
-#     scraper = ETFScraper()
+        以基本指標比較表為底，加入風險分析各指標的數值與排名百分位，
+        以及各期間報酬率與同類型排名百分位（排名/總數，越小越好）。
+        Starts from the basic metrics table and adds each risk metric's value and
+        rank percentile, plus per-period returns and peer rank percentile
+        (rank / total, lower is better).
 
-#     # 指定要查詢的ETF代碼 (Specify ETF code to query)
-#     etf_code = 'VT'
+        Args:
+            all_data (Dict[str, Dict]): ETF代碼對應 get_all_data 結果的字典
+                                      Mapping of ETF code to get_all_data result
+            basic_metrics_df (pd.DataFrame): 基本指標比較表 (Basic metrics table)
 
-#     # 獲取所有數據 (Get all data)
-#     data = scraper.get_all_data(etf_code)
+        Returns:
+            pd.DataFrame: ETF總表 (Universe table)
+        """
+        if basic_metrics_df.empty:
+            return pd.DataFrame()
+
+        extra_data = []
+        for etf_code in basic_metrics_df['ETF代碼']:
+            data = all_data[etf_code]
+            row = {'ETF代碼': etf_code}
+
+            for metric, info in data.get('risk_analysis', {}).items():
+                row[metric] = info.get('value')
+                if info.get('rank') and info.get('total'):
+                    row[f'{metric}排名百分位'] = info['rank'] / info['total']
+
+            monthly_df = data.get('return_comparison', {}).get('monthly')
+            if monthly_df is not None and len(monthly_df) > 2:
+                etf_row = monthly_df.iloc[0]
+                rank_row = monthly_df.iloc[2]
+                for period in ['今年起', '一個月', '三個月', '六個月', '一年', '二年', '三年']:
+                    if period not in etf_row:
+                        continue
+                    row[f'{period}報酬率'] = etf_row.get(period)
+                    ranking = self._parse_ranking(rank_row.get(period))
+                    if isinstance(ranking, tuple) and ranking[0] and ranking[1]:
+                        row[f'{period}同類排名百分位'] = ranking[0] / ranking[1]
+
+            extra_data.append(row)
+
+        universe_df = basic_metrics_df.merge(
+            pd.DataFrame(extra_data), on='ETF代碼', how='left')
+        numeric_columns = universe_df.columns.drop(['ETF代碼', 'ETF名稱'])
+        universe_df[numeric_columns] = universe_df[numeric_columns].apply(
+            pd.to_numeric, errors='coerce')
+        return universe_df
+
+
+class ETFScraper(ETFScraperBase):
+    """
+    ETF資料爬蟲類別
+    ETF Data Scraper Class
 
-#     # 顯示基本資訊 (Display basic information)
-#     print("\n基本資訊 (Basic Information):")
-#     print(pd.DataFrame([data['basic_info']]))
+    用於抓取和處理ETF相關資訊的類別，提供多個方法來獲取不同類型的ETF數據。
+    A class for scraping and processing ETF-related information, providing multiple methods
+    to retrieve different types of ETF data.
+    """
 
-#     # 顯示持股資訊 (Display holdings information)
-#     print("\n持股資訊 (Holdings Information):")
-#     holdings = data.get('holdings', {})
-#     for holding_type in ['holdings_by_region', 'holdings_by_sector', 'top_holdings']:
-#         df = holdings.get(holding_type)
-#         if df is not None and not df.empty:
-#             print(f"\n{holding_type}:")
-#             print(df)
-#         else:
-#             print(f"\n{holding_type}: 無資料 (No data)")
+    def _get_soup(self, url: str) -> BeautifulSoup:
+        """
+        獲取網頁內容並返回BeautifulSoup對象
+        Get webpage content and return BeautifulSoup object
 
-#     # 顯示風險分析 (Display risk analysis)
-#     print("\n風險分析 (Risk Analysis):")
-#     print(pd.DataFrame(data['risk_analysis']).T)
+        Args:
+            url (str): 目標網頁URL (Target webpage URL)
 
-#     # 顯示報酬比較 (Display return comparison)
-#     print("\n報酬比較 (Return Comparison):")
-#     if 'comparison' in data['return_comparison']:
-#         print(data['return_comparison']['comparison'])
+        Returns:
+            BeautifulSoup: 解析後的HTML內容 (Parsed HTML content)
+        """
+        return self._make_soup(self._fetch_html(url))
 
-#     # 顯示月份報酬比較 (Display monthly return comparison)
-#     print("\n月份報酬比較 (Monthly Return Comparison):")
-#     if 'monthly' in data['return_comparison']:
-#         print(data['return_comparison']['monthly'])
+    def _fetch_html(self, url: str) -> str:
+        """
+        透過傳輸層取得網頁HTML，並檢查記憶體上限
+        Get webpage HTML through the transport and check the memory budget
 
-#     # 顯示報酬走勢 (Display return trends)
-#     print("\n報酬走勢 (Return Trends):")
-#     print("月報酬率 (Monthly Returns):")
-#     print(data['return_trends']['monthly_return'])
-#     print("\n季報酬率 (Quarterly Returns):")
-#     print(data['return_trends']['quarterly_return'])
-#     print("\n年報酬率 (Yearly Returns):")
-#     print(data['return_trends']['yearly_return'])
+        Args:
+            url (str): 目標網頁URL (Target webpage URL)
+
+        Returns:
+            str: 網頁HTML內容 (Webpage HTML content)
+        """
+        html = self.transport.fetch(url)
+        self._check_memory()
+        return html
+
+    def get_basic_info(self, etf_code: str) -> Dict:
+        """
+        獲取ETF基本資訊
+        Get ETF basic information
+
+        抓取ETF的基本資料，包括名稱、代碼、規模、費用等
+        Scrape basic ETF data including name, code, size, fees, etc.
+
+        Args:
+            etf_code (str): ETF代碼 (ETF code)
+
+        Returns:
+            Dict: 包含以下欄位的字典 (Dictionary containing following fields):
+                - ETF名稱 (ETF name)
+                - 交易所代碼 (Exchange code)
+                - 英文名稱 (English name)
+                - 發行公司 (Issuer)
+                - 成立日期 (Inception date)
+                - ETF規模 (ETF size)
+                - 成交量 (Trading volume)
+                - ETF市價 (ETF price)
+                - ETF淨值 (ETF NAV)
+                - 折溢價(%) (Premium/Discount(%))
+                - 配息頻率 (Distribution frequency)
+                - 總管理費用(%) (Total expense ratio(%))
+                - 殖利率(%) (Yield(%))
+                - 年化標準差(%) (Annualized standard deviation(%))
+        """
+        soup = self._get_soup(self._build_url('basic_info', etf_code))
+        return self._parse_basic_info(soup)
+
+    def get_holdings(self, etf_code: str) -> Dict[str, Optional[Union[pd.DataFrame, HoldingsHandle]]]:
+        """
+        獲取ETF的全部持股資訊
+        Get all holdings information of the ETF
+
+        抓取三種持股相關資訊：
+        Scrape three types of holdings information:
+        1. 依區域的持股分布 (Holdings distribution by region)
+        2. 依產業的持股分布 (Holdings distribution by sector)
+        3. 主要持股明細 (Top holdings details)
+
+        Args:
+            etf_code (str): ETF代碼 (ETF code)
+
+        Returns:
+            Dict[str, Optional[Union[pd.DataFrame, HoldingsHandle]]]: 包含三個DataFrame的字典，
+                限制記憶體模式下 top_holdings 為 HoldingsHandle
+                Dictionary containing three DataFrames, top_holdings is a
+                HoldingsHandle in memory-bounded mode:
+                - holdings_by_region: 依區域分布 (Distribution by region)
+                - holdings_by_sector: 依產業分布 (Distribution by sector)
+                - top_holdings: 主要持股明細 (Top holdings details)
+        """
+        url = self._build_url('holdings', etf_code)
+        if self.holdings_dir:
+            base_dir = self._holdings_path(etf_code)
+            return self._stream_holdings(self._fetch_html(url), base_dir)
+        return self._parse_holdings(self._get_soup(url))
+
+    def get_risk_analysis(self, etf_code: str) -> Dict:
+        """
+        獲取風險分析數據
+        Get risk analysis data
+
+        抓取ETF的風險指標，包括追蹤誤差和季均折溢價等
+        Scrape ETF risk indicators including tracking error and quarterly premium/discount
+
+        Args:
+            etf_code (str): ETF代碼 (ETF code)
+
+        Returns:
+            Dict: 包含以下風險指標的字典 (Dictionary containing following risk indicators):
+                - 日期 (date)
+                - 數值 (value)
+                - 排名 (rank)
+                - 總數 (total)
+        """
+        soup = self._get_soup(self._build_url('risk_analysis', etf_code))
+        return self._parse_risk_analysis(soup)
+
+    def get_return_comparison(self, etf_code: str) -> Dict[str, pd.DataFrame]:
+        """
+        獲取報酬比較數據
+        Get return comparison data
+
+        抓取ETF與同類型ETF的報酬率比較數據
+        Scrape return comparison data between the ETF and similar ETFs
+
+        Args:
+            etf_code (str): ETF代碼 (ETF code)
+
+        Returns:
+            Dict[str, pd.DataFrame]: 包含兩個DataFrame的字典 
+                                   Dictionary containing two DataFrames:
+                - comparison: 報酬率比較表 (Return comparison table)
+                - monthly: 月份報酬比較表 (Monthly return comparison table)
+        """
+        soup = self._get_soup(self._build_url('return_comparison', etf_code))
+        return self._parse_return_comparison(soup)
+
+    def get_return_trends(self, etf_code: str) -> Dict[str, pd.DataFrame]:
+        """
+        獲取報酬走勢數據
+        Get return trend data
+
+        抓取ETF的月度、季度和年度報酬率數據
+        Scrape monthly, quarterly, and yearly return data of the ETF
+
+        Args:
+            etf_code (str): ETF代碼 (ETF code)
+
+        Returns:
+            Dict[str, pd.DataFrame]: 包含三個DataFrame的字典 
+                                   Dictionary containing three DataFrames:
+                - monthly_return: 月報酬率 (Monthly returns)
+                - quarterly_return: 季報酬率 (Quarterly returns)
+                - yearly_return: 年報酬率 (Yearly returns)
+        """
+        soup = self._get_soup(self._build_url('return_trends', etf_code))
+        return self._parse_return_trends(soup)
+
+    def get_all_data(self, etf_code: str) -> Dict:
+        """
+        獲取ETF的所有數據
+        Get all data for the ETF
+
+        整合所有ETF相關資訊的主要方法
+        Main method to integrate all ETF-related information
+
+        Args:
+            etf_code (str): ETF代碼 (ETF code)
+
+        Returns:
+            Dict: 包含所有ETF資訊的字典 (Dictionary containing all ETF information):
+                - basic_info: 基本資訊 (Basic information)
+                - holdings: 持股資訊 (Holdings information)
+                - risk_analysis: 風險分析 (Risk analysis)
+                - return_comparison: 報酬比較 (Return comparison)
+                - return_trends: 報酬走勢 (Return trends)
+        """
+        return {
+            'basic_info': self.get_basic_info(etf_code),
+            'holdings': self.get_holdings(etf_code),
+            'risk_analysis': self.get_risk_analysis(etf_code),
+            'return_comparison': self.get_return_comparison(etf_code),
+            'return_trends': self.get_return_trends(etf_code)
+        }
+
+    def compare_etfs(self, etf_codes: List[str]) -> Dict[str, pd.DataFrame]:
+        """
+        比較多個ETF的關鍵指標
+        Compare key indicators of multiple ETFs
+
+        Args:
+            etf_codes (List[str]): ETF代碼列表，例如 ['00770.TW', '00830.TW', 'QQQM']
+                                List of ETF codes, e.g., ['00770.TW', '00830.TW', 'QQQM']
+
+        Returns:
+            Dict[str, pd.DataFrame]: 包含以下比較表的字典 Dictionary containing following comparison tables:
+                - basic_metrics: 基本指標比較 (Basic metrics comparison)
+                - returns: 報酬率比較 (Return comparison)
+                - peer_comparison: 同類型比較 (Peer comparison)
+                - universe: 篩選用ETF總表，可交給 ETFScreener (Screening universe, see ETFScreener)
+        """
+        # 儲存所有ETF的資料
+        all_data = {}
+        for etf_code in etf_codes:
+            try:
+                data = self.get_all_data(etf_code)
+                # 確保基本資訊存在
+                if 'basic_info' not in data:
+                    print(f"No basic info for {etf_code}")
+                    continue
+                all_data[etf_code] = data
+            except MemoryBudgetExceeded:
+                raise
+            except Exception as e:
+                print(f"Error getting data for {etf_code}: {e}")
+                continue
+
+        return self._build_comparison(all_data)
+
+
+class AsyncETFScraper(ETFScraperBase):
+    """
+    非同步ETF資料爬蟲類別
+    Asynchronous ETF Data Scraper Class
+
+    ETFScraper 的非同步版本，透過共用的 aiohttp 連線池抓取網頁，並以 semaphore
+    限制同時進行的請求數量。解析邏輯沿用 ETFScraperBase 的 _parse_* 方法。
+    Async twin of ETFScraper. Pages are fetched over a shared, pooled aiohttp
+    session and the number of in-flight requests is bounded by a semaphore.
+    Parsing reuses the _parse_* methods of ETFScraperBase.
+
+    解析（BeautifulSoup 與 pandas）在執行緒池中進行，避免阻塞事件迴圈。
+    Parsing (BeautifulSoup and pandas) runs in a thread pool so it never
+    blocks the event loop.
+    """
+
+    def __init__(self, max_concurrency: int = 20, connection_limit: int = 100,
+                 timeout: float = 30, transport: Optional['Transport'] = None,
+                 holdings_dir: Optional[str] = None, chunk_size: int = 1000,
+                 rss_budget_mb: Optional[float] = None, keep_versions: Optional[int] = 2,
+                 parse_executor: Optional[Executor] = None):
+        """
+        初始化非同步爬蟲器
+        Initialize the asynchronous scraper
+
+        Args:
+            max_concurrency (int): 同時進行的最大請求數 (Maximum number of in-flight requests)
+            connection_limit (int): 連線池大小 (Connection pool size)
+            timeout (float): 單一請求逾時秒數 (Per-request timeout in seconds)
+            transport (Optional[Transport]): 取得網頁的傳輸層，預設使用 aiohttp 連線池
+                                           Transport used to fetch pages, defaults to the aiohttp pool
+            holdings_dir, chunk_size, rss_budget_mb, keep_versions: 限制記憶體模式，見 ETFScraperBase
+                                                                    Memory-bounded mode, see ETFScraperBase
+            parse_executor (Optional[Executor]): 執行解析的執行緒池，預設使用事件迴圈的預設執行緒池
+                                               Thread pool that runs parsing, defaults to the loop's default executor
+        """
+        if transport is None and aiohttp is None:
+            raise ImportError("AsyncETFScraper requires aiohttp: pip install aiohttp")
+        super().__init__(transport, holdings_dir, chunk_size, rss_budget_mb, keep_versions)
+        self._use_aiohttp = transport is None
+        self.max_concurrency = max_concurrency
+        self.connection_limit = connection_limit
+        self.timeout = timeout
+        self.parse_executor = parse_executor
+        self._session = None
+        self._semaphore = None
+
+    async def __aenter__(self) -> 'AsyncETFScraper':
+        if self._use_aiohttp:
+            await self._get_session()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """
+        關閉連線池
+        Close the connection pool
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _get_session(self) -> 'aiohttp.ClientSession':
+        """
+        取得共用的連線池，必要時建立
+        Get the shared connection pool, creating it if necessary
+
+        Returns:
+            aiohttp.ClientSession: 共用連線 (Shared session)
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                headers=self.headers,
+                connector=aiohttp.TCPConnector(limit=self.connection_limit),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+        return self._session
+
+    async def _fetch_html(self, url: str) -> str:
+        """
+        非同步獲取網頁HTML
+        Asynchronously get webpage HTML
+
+        Args:
+            url (str): 目標網頁URL (Target webpage URL)
+
+        Returns:
+            str: 網頁HTML內容 (Webpage HTML content)
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async with self._semaphore:
+            if self._use_aiohttp:
+                session = await self._get_session()
+                async with session.get(url) as response:
+                    html = await response.text(encoding='utf-8')
+            else:
+                html = await self.transport.fetch_async(url)
+        self._check_memory()
+        return html
+
+    async def _get_soup(self, url: str) -> BeautifulSoup:
+        """
+        非同步獲取網頁內容並返回BeautifulSoup對象
+        Asynchronously get webpage content and return BeautifulSoup object
+
+        Args:
+            url (str): 目標網頁URL (Target webpage URL)
+
+        Returns:
+            BeautifulSoup: 解析後的HTML內容 (Parsed HTML content)
+        """
+        html = await self._fetch_html(url)
+        return await self._run_parser(self._make_soup, html)
+
+    async def _run_parser(self, func, *args):
+        """
+        在執行緒池中執行解析函式
+        Run a parsing function in the thread pool
+
+        Args:
+            func: 解析函式 (Parsing function)
+            *args: 函式參數 (Function arguments)
+
+        Returns:
+            解析結果 (Parsing result)
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.parse_executor, func, *args)
+
+    async def _fetch_and_parse(self, page: str, etf_code: str, parser, *args):
+        """
+        抓取頁面，並在執行緒池中建立BeautifulSoup對象與執行 _parse_* 方法
+        Fetch a page, then build the soup and run the _parse_* method in the thread pool
+
+        Args:
+            page (str): 頁面名稱，須為 URLS 的鍵 (Page name, a key of URLS)
+            etf_code (str): ETF代碼 (ETF code)
+            parser: 接收BeautifulSoup對象的解析方法 (Parsing method taking the soup)
+            *args: 解析方法的額外參數 (Extra arguments for the parsing method)
+
+        Returns:
+            解析結果 (Parsing result)
+        """
+        html = await self._fetch_html(self._build_url(page, etf_code))
+        return await self._run_parser(
+            lambda: parser(self._make_soup(html), *args))
+
+    async def get_basic_info(self, etf_code: str) -> Dict:
+        """
+        非同步獲取ETF基本資訊，回傳格式同 ETFScraper.get_basic_info
+        Asynchronously get ETF basic information, same format as ETFScraper.get_basic_info
+        """
+        return await self._fetch_and_parse('basic_info', etf_code, self._parse_basic_info)
+
+    async def get_holdings(self, etf_code: str) -> Dict[str, Optional[Union[pd.DataFrame, HoldingsHandle]]]:
+        """
+        非同步獲取ETF持股資訊，回傳格式同 ETFScraper.get_holdings
+        Asynchronously get ETF holdings, same format as ETFScraper.get_holdings
+        """
+        if self.holdings_dir:
+            base_dir = self._holdings_path(etf_code)
+            html = await self._fetch_html(self._build_url('holdings', etf_code))
+            return await self._run_parser(self._stream_holdings, html, base_dir)
+        return await self._fetch_and_parse('holdings', etf_code, self._parse_holdings)
+
+    async def get_risk_analysis(self, etf_code: str) -> Dict:
+        """
+        非同步獲取風險分析數據，回傳格式同 ETFScraper.get_risk_analysis
+        Asynchronously get risk analysis data, same format as ETFScraper.get_risk_analysis
+        """
+        return await self._fetch_and_parse('risk_analysis', etf_code, self._parse_risk_analysis)
+
+    async def get_return_comparison(self, etf_code: str) -> Dict[str, pd.DataFrame]:
+        """
+        非同步獲取報酬比較數據，回傳格式同 ETFScraper.get_return_comparison
+        Asynchronously get return comparison data, same format as ETFScraper.get_return_comparison
+        """
+        return await self._fetch_and_parse('return_comparison', etf_code, self._parse_return_comparison)
+
+    async def get_return_trends(self, etf_code: str) -> Dict[str, pd.DataFrame]:
+        """
+        非同步獲取報酬走勢數據，回傳格式同 ETFScraper.get_return_trends
+        Asynchronously get return trend data, same format as ETFScraper.get_return_trends
+        """
+        return await self._fetch_and_parse('return_trends', etf_code, self._parse_return_trends)
+
+    async def get_all_data(self, etf_code: str) -> Dict:
+        """
+        同時抓取ETF的所有頁面，回傳格式同 ETFScraper.get_all_data
+        Fetch all pages of the ETF concurrently, same format as ETFScraper.get_all_data
+        """
+        basic_info, holdings, risk_analysis, return_comparison, return_trends = \
+            await asyncio.gather(
+                self.get_basic_info(etf_code),
+                self.get_holdings(etf_code),
+                self.get_risk_analysis(etf_code),
+                self.get_return_comparison(etf_code),
+                self.get_return_trends(etf_code)
+            )
+        return {
+            'basic_info': basic_info,
+            'holdings': holdings,
+            'risk_analysis': risk_analysis,
+            'return_comparison': return_comparison,
+            'return_trends': return_trends
+        }
+
+    async def compare_etfs(self, etf_codes: List[str]) -> Dict[str, pd.DataFrame]:
+        """
+        同時抓取多個ETF並比較關鍵指標，回傳格式同 ETFScraper.compare_etfs
+        Fetch multiple ETFs concurrently and compare key indicators,
+        same format as ETFScraper.compare_etfs
+
+        Args:
+            etf_codes (List[str]): ETF代碼列表 (List of ETF codes)
+
+        Returns:
+            Dict[str, pd.DataFrame]: 欄位同 ETFScraper.compare_etfs (Same keys as ETFScraper.compare_etfs)
+        """
+        results = await asyncio.gather(
+            *(self.get_all_data(etf_code) for etf_code in etf_codes),
+            return_exceptions=True
+        )
+
+        all_data = {}
+        for etf_code, data in zip(etf_codes, results):
+            if isinstance(data, MemoryBudgetExceeded):
+                raise data
+            if isinstance(data, Exception):
+                print(f"Error getting data for {etf_code}: {data}")
+                continue
+            all_data[etf_code] = data
+
+        return await self._run_parser(self._build_comparison, all_data)
+
+
+class ETFScreener:
+    """
+    ETF篩選與排名類別
+    ETF Screening and Ranking Class
+
+    以 compare_etfs 產生的 universe 總表為基礎，對每個數值欄位預先建立排序索引，
+    使區間篩選（二分搜尋）與前k名排名不需每次重新排序整張表。
+    Works on the universe table produced by compare_etfs. A sorted index is
+    built once per numeric column, so range filters (binary search) and top-k
+    rankings never re-sort the table.
+
+    使用方式 (Usage):
+        screener = ETFScreener(scraper.compare_etfs(etf_codes)['universe'])
+        q75 = screener.quantile('一年報酬率', 0.75)
+        screener.screen({'一年報酬率': (q75, None)}, sort_by='總管理費用(%)', top_k=10)
+    """
+
+    def __init__(self, universe: pd.DataFrame):
+        """
+        建立各數值欄位的排序索引與最小/最大值統計
+        Build sorted indexes and min/max stats for each numeric column
+
+        Args:
+            universe (pd.DataFrame): compare_etfs 回傳的 universe 表 (Universe table from compare_etfs)
+        """
+        self.universe = universe.reset_index(drop=True)
+        self._indexes = {}
+        self._stats = {}
+
+        for column in self.universe.select_dtypes(include='number').columns:
+            values = self.universe[column].to_numpy(dtype=float)
+            positions = np.flatnonzero(~np.isnan(values))
+            order = positions[np.argsort(values[positions], kind='stable')]
+            # 以負值穩定排序，使由大到小時同值維持原順序 (Stable sort on negated values keeps ties in table order when descending)
+            desc_order = positions[np.argsort(-values[positions], kind='stable')]
+            sorted_values = values[order]
+            self._indexes[column] = (sorted_values, order, desc_order)
+            if len(sorted_values):
+                self._stats[column] = {
+                    'min': sorted_values[0],
+                    'max': sorted_values[-1],
+                    'count': len(sorted_values)
+                }
+
+    def stats(self) -> pd.DataFrame:
+        """
+        各數值欄位的最小值、最大值與非空筆數
+        Min, max and non-null count of each numeric column
+
+        Returns:
+            pd.DataFrame: 以欄位名稱為索引的統計表 (Stats indexed by column name)
+        """
+        return pd.DataFrame(self._stats).T
+
+    def quantile(self, column: str, q: float) -> Optional[float]:
+        """
+        取得欄位的分位數，例如 q=0.75 為前四分之一的門檻
+        Get a column quantile, e.g. q=0.75 is the top-quartile threshold
+
+        Args:
+            column (str): 欄位名稱 (Column name)
+            q (float): 分位數，介於0與1之間 (Quantile between 0 and 1)
+
+        Returns:
+            Optional[float]: 分位數值，若該欄無資料則返回None
+                           Quantile value, or None if the column has no data
+        """
+        sorted_values = self._indexes[column][0]
+        if len(sorted_values) == 0:
+            return None
+        return float(np.quantile(sorted_values, q))
+
+    def _range_mask(self, column: str, low: Optional[float],
+                    high: Optional[float]) -> np.ndarray:
+        """
+        以二分搜尋取得落在 [low, high] 區間的列
+        Select rows within [low, high] using binary search
+
+        Args:
+            column (str): 欄位名稱 (Column name)
+            low (Optional[float]): 下限，None 表示不限 (Lower bound, None for unbounded)
+            high (Optional[float]): 上限，None 表示不限 (Upper bound, None for unbounded)
+
+        Returns:
+            np.ndarray: 各列是否符合條件的布林陣列 (Boolean mask over rows)
+        """
+        if column not in self._indexes:
+            raise KeyError(f"Unknown or non-numeric column: {column}")
+
+        mask = np.zeros(len(self.universe), dtype=bool)
+        stats = self._stats.get(column)
+        if stats is None:
+            return mask
+        if (low is not None and low > stats['max']) or \
+                (high is not None and high < stats['min']):
+            return mask
+
+        sorted_values, order, _ = self._indexes[column]
+        start = 0 if low is None else np.searchsorted(sorted_values, low, side='left')
+        end = len(sorted_values) if high is None else \
+            np.searchsorted(sorted_values, high, side='right')
+        mask[order[start:end]] = True
+        return mask
+
+    def screen(self, filters: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+               sort_by: Optional[str] = None, ascending: bool = True,
+               top_k: Optional[int] = None) -> pd.DataFrame:
+        """
+        依區間條件篩選ETF，並可依欄位排序取前k名
+        Filter ETFs by range conditions, optionally ranking by a column and keeping the top k
+
+        Args:
+            filters (Dict[str, Tuple[Optional[float], Optional[float]]]):
+                欄位對應 (下限, 上限) 的字典，上下限皆包含，None 表示不限
+                Mapping of column to inclusive (low, high), None for unbounded,
+                例如 (e.g.) {'總管理費用(%)': (None, 0.5), '殖利率(%)': (3, None)}
+            sort_by (Optional[str]): 排序欄位，該欄為空值的ETF不列入結果 (Sort column, ETFs with a null in it are dropped)
+            ascending (bool): 是否由小到大排序 (Whether to sort ascending)
+            top_k (Optional[int]): 保留筆數 (Number of rows to keep)
+
+        Returns:
+            pd.DataFrame: 符合條件的ETF (Matching ETFs)
+        """
+        mask = np.ones(len(self.universe), dtype=bool)
+        for column, (low, high) in (filters or {}).items():
+            mask &= self._range_mask(column, low, high)
+
+        if sort_by is None:
+            positions = np.flatnonzero(mask)
+        else:
+            if sort_by not in self._indexes:
+                raise KeyError(f"Unknown or non-numeric column: {sort_by}")
+            _, asc_order, desc_order = self._indexes[sort_by]
+            order = asc_order if ascending else desc_order
+            positions = order[mask[order]]
+
+        if top_k is not None:
+            positions = positions[:top_k]
+        return self.universe.iloc[positions]
+
+    def top_k(self, column: str, k: int, ascending: bool = True) -> pd.DataFrame:
+        """
+        依欄位取前k名
+        Get the top k ETFs by a column
+
+        Args:
+            column (str): 排序欄位 (Sort column)
+            k (int): 筆數 (Number of rows)
+            ascending (bool): 是否由小到大排序 (Whether to sort ascending)
+
+        Returns:
+            pd.DataFrame: 前k名ETF (Top k ETFs)
+        """
+        return self.screen(sort_by=column, ascending=ascending, top_k=k)
+
+
+class HoldingsDiffTracker:
+    """
+    持股異動追蹤類別
+    Holdings Change Tracker Class
+
+    保存每個ETF最近一次的持股快照（以名稱為鍵的字典），與新抓取的持股比對後，
+    將新增、移除與權重/股數變動以一行一筆的JSON事件附加到事件記錄檔。
+    第一次看到某ETF時只建立快照，不產生事件；某張表未能解析（None）時
+    保留該表上次的快照，不產生事件。同名持股以「名稱#n」區分。
+    Keeps the last holdings snapshot of each ETF as dictionaries keyed by name,
+    diffs newly scraped holdings against it and appends add/remove/update events
+    to a JSON Lines log, one event per line. The first snapshot of an ETF only
+    sets the baseline and emits no events. A table that failed to parse (None)
+    keeps its previous snapshot and emits nothing. Repeated names are keyed as
+    "name#n".
+
+    使用方式 (Usage):
+        tracker = HoldingsDiffTracker(ETFScraper(), 'holdings_events.jsonl',
+                                      state_dir='holdings_state')
+        events = tracker.update('VT')
+        new_events, offset = HoldingsDiffTracker.read_events('holdings_events.jsonl', offset)
+    """
+
+    # 各持股表的鍵欄位、權重欄位與數量欄位 (Key, weight and quantity column per table)
+    TABLE_COLUMNS = {
+        'top_holdings': ('個股名稱', '投資比例(%)', '持有股數'),
+        'holdings_by_region': ('區域', '比例(%)', '投資金額(萬美元)'),
+        'holdings_by_sector': ('產業', '比例(%)', '投資金額(萬美元)')
+    }
+
+    def __init__(self, scraper: ETFScraper, log_path: str,
+                 state_dir: Optional[str] = None):
+        """
+        初始化追蹤器
+        Initialize the tracker
+
+        Args:
+            scraper (ETFScraper): 用於抓取持股的同步爬蟲器 (Synchronous scraper used to fetch holdings)
+            log_path (str): 事件記錄檔路徑 (JSON Lines event log path)
+            state_dir (Optional[str]): 快照狀態目錄，每個ETF一個檔案，None 則只保存在記憶體
+                                     Snapshot state directory with one file per ETF,
+                                     None keeps snapshots in memory only
+        """
+        if isinstance(scraper, AsyncETFScraper):
+            raise TypeError("HoldingsDiffTracker requires a synchronous ETFScraper")
+        self.scraper = scraper
+        self.log_path = log_path
+        self.state_dir = state_dir
+        self._snapshots = {}
+
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+
+    def _state_path(self, etf_code: str) -> str:
+        """
+        ETF的快照狀態檔路徑
+        Snapshot state file path of an ETF
+
+        Args:
+            etf_code (str): ETF代碼 (ETF code)
+
+        Returns:
+            str: 狀態檔路徑 (State file path)
+        """
+        return os.path.join(self.state_dir, quote(etf_code, safe='') + '.json')
+
+    def _load_snapshot(self, etf_code: str) -> Optional[Dict[str, Dict[str, List]]]:
+        """
+        取得ETF上次的快照，必要時自狀態檔讀入
+        Get the previous snapshot of an ETF, reading it from its state file if needed
+
+        Args:
+            etf_code (str): ETF代碼 (ETF code)
+
+        Returns:
+            Optional[Dict[str, Dict[str, List]]]: 上次的快照，沒有則返回None
+                                                Previous snapshot, or None if there is none
+        """
+        if etf_code not in self._snapshots and self.state_dir:
+            path = self._state_path(etf_code)
+            if os.path.exists(path):
+                with open(path, encoding='utf-8') as f:
+                    self._snapshots[etf_code] = json.load(f)
+        return self._snapshots.get(etf_code)
+
+    def _snapshot(self, holdings: Dict[str, Optional[pd.DataFrame]]) -> Dict[str, Optional[Dict[str, List]]]:
+        """
+        將持股DataFrame轉為以名稱為鍵的精簡快照
+        Turn holdings DataFrames into a compact snapshot keyed by name
+
+        同一張表中重複出現的名稱，第n次出現時以「名稱#n」為鍵。
+        A name repeated within a table is keyed as "name#n" on its n-th occurrence.
+
+        Args:
+            holdings (Dict[str, Optional[pd.DataFrame]]): get_holdings 的結果 (Result of get_holdings)
+
+        Returns:
+            Dict[str, Optional[Dict[str, List]]]: 表名 -> {名稱: [權重, 數量]}，未解析的表為None
+                                                Table -> {name: [weight, quantity]}, None for unparsed tables
+        """
+        snapshot = {}
+        for table, (key_col, weight_col, quantity_col) in self.TABLE_COLUMNS.items():
+            df = holdings.get(table)
+            if df is None:
+                snapshot[table] = None
+                continue
+
+            entries = {}
+            seen = {}
+            chunks = df.iter_chunks() if isinstance(df, HoldingsHandle) else [df]
+            for chunk in chunks:
+                for key, weight, quantity in zip(
+                        chunk[key_col], chunk[weight_col], chunk[quantity_col]):
+                    key = str(key)
+                    seen[key] = seen.get(key, 0) + 1
+                    if seen[key] > 1:
+                        key = f'{key}#{seen[key]}'
+                    entries[key] = [float(weight), float(quantity)]
+            snapshot[table] = entries
+        return snapshot
+
+    def _diff(self, etf_code: str, table: str, before: Dict[str, List],
+              after: Dict[str, List], timestamp: str) -> List[Dict]:
+        """
+        比對同一張持股表的兩個快照
+        Diff two snapshots of the same holdings table
+
+        Args:
+            etf_code (str): ETF代碼 (ETF code)
+            table (str): 持股表名稱 (Holdings table name)
+            before (Dict[str, List]): 上次快照 (Previous snapshot)
+            after (Dict[str, List]): 本次快照 (Current snapshot)
+            timestamp (str): 事件時間 (Event time)
+
+        Returns:
+            List[Dict]: 異動事件列表 (List of change events)
+        """
+        events = []
+
+        def event(change, key, old, new):
+            return {
+                'timestamp': timestamp,
+                'etf_code': etf_code,
+                'table': table,
+                'change': change,
+                'key': key,
+                'weight_before': old[0] if old else None,
+                'weight_after': new[0] if new else None,
+                'quantity_before': old[1] if old else None,
+                'quantity_after': new[1] if new else None
+            }
+
+        for key, new in after.items():
+            old = before.get(key)
+            if old is None:
+                events.append(event('add', key, None, new))
+            elif old != new:
+                events.append(event('update', key, old, new))
+
+        for key, old in before.items():
+            if key not in after:
+                events.append(event('remove', key, old, None))
+
+        return events
+
+    def record(self, etf_code: str, holdings: Dict[str, Optional[pd.DataFrame]],
+               timestamp: Optional[str] = None) -> List[Dict]:
+        """
+        記錄一次持股結果並寫出與上次快照的差異
+        Record a holdings result and append its diff against the last snapshot
+
+        Args:
+            etf_code (str): ETF代碼 (ETF code)
+            holdings (Dict[str, Optional[pd.DataFrame]]): get_holdings 的結果 (Result of get_holdings)
+            timestamp (Optional[str]): 事件時間，預設為現在 (Event time, defaults to now)
+
+        Returns:
+            List[Dict]: 本次寫出的事件 (Events appended by this call)
+        """
+        timestamp = timestamp or datetime.now().isoformat(timespec='seconds')
+        snapshot = self._snapshot(holdings)
+        previous = self._load_snapshot(etf_code)
+
+        events = []
+        for table in self.TABLE_COLUMNS:
+            before = previous.get(table) if previous is not None else None
+            if snapshot[table] is None:
+                # 解析失敗時沿用上次快照，避免產生整表移除/新增 (Keep the old table on a failed parse)
+                snapshot[table] = before
+            elif before is not None:
+                events.extend(self._diff(etf_code, table, before,
+                                         snapshot[table], timestamp))
+
+        if events:
+            with open(self.log_path, 'a', encoding='utf-8') as f:
+                for event in events:
+                    f.write(json.dumps(event, ensure_ascii=False) + '\n')
+
+        self._snapshots[etf_code] = snapshot
+        if self.state_dir:
+            self._save_state(etf_code)
+
+        return events
+
+    def update(self, etf_code: str) -> List[Dict]:
+        """
+        抓取最新持股並記錄差異
+        Fetch the latest holdings and record the diff
+
+        Args:
+            etf_code (str): ETF代碼 (ETF code)
+
+        Returns:
+            List[Dict]: 本次寫出的事件 (Events appended by this call)
+        """
+        return self.record(etf_code, self.scraper.get_holdings(etf_code))
+
+    def _save_state(self, etf_code: str) -> None:
+        """
+        將單一ETF的快照寫入其狀態檔（先寫暫存檔再取代，避免中斷時損毀）
+        Write one ETF's snapshot to its state file (via a temp file so an interruption cannot corrupt it)
+
+        Args:
+            etf_code (str): ETF代碼 (ETF code)
+        """
+        path = self._state_path(etf_code)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self._snapshots[etf_code], f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def read_events(log_path: str, offset: int = 0) -> Tuple[List[Dict], int]:
+        """
+        從指定位置讀取事件記錄，供消費端持續追蹤新事件
+        Read events from a byte offset so consumers can tail the log
+
+        Args:
+            log_path (str): 事件記錄檔路徑 (Event log path)
+            offset (int): 上次讀取結束的位置 (Byte offset where the last read ended)
+
+        Returns:
+            Tuple[List[Dict], int]: 新事件與下次讀取的位置 (New events and the next offset)
+        """
+        if not os.path.exists(log_path):
+            return [], offset
+
+        events = []
+        with open(log_path, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                # 略過尚未寫完的最後一行 (Skip a trailing line that is still being written)
+                if not line.endswith(b'\n'):
+                    break
+                events.append(json.loads(line))
+                offset += len(line)
+        return events, offset
+
+
+class ETFDataCache:
+    """
+    ETF資料記憶體快取類別
+    In-memory ETF Data Cache Class
+
+    在多個使用者之間共用爬蟲結果：每筆資料有存活時間（TTL），同一筆資料同時
+    有多個請求時只向 MoneyDJ 發出一次（request coalescing），並由背景執行緒在
+    熱門資料到期前重新抓取。JSON 內容會一併快取，命中時不需重新序列化。
+    Shares scraped results between callers: every entry has a TTL, concurrent
+    misses for the same entry trigger a single upstream fetch (request
+    coalescing), and a background thread refreshes hot entries before they
+    expire. The JSON body is cached too, so hits skip serialization.
+
+    過期且不熱門的資料由背景執行緒移除，項目數超過 max_entries 時淘汰最久未使用者。
+    get_all_data 與 compare_etfs 由各頁面資料組合，其到期時間取組成資料中最早者。
+    Expired entries that are not hot are evicted by the background thread, and
+    the least recently used entries are dropped beyond max_entries.
+    get_all_data and compare_etfs are assembled from page entries and expire
+    with the earliest of them.
+    """
+
+    # 可透過快取呼叫的方法 (Methods that can be called through the cache)
+    METHODS = ('get_basic_info', 'get_holdings', 'get_risk_analysis',
+               'get_return_comparison', 'get_return_trends', 'get_all_data',
+               'compare_etfs')
+
+    def __init__(self, scraper: Optional[ETFScraper] = None, ttl: float = 300,
+                 refresh_interval: float = 30, hot_window: float = 600,
+                 max_entries: int = 10000):
+        """
+        初始化快取
+        Initialize the cache
+
+        Args:
+            scraper (Optional[ETFScraper]): 實際抓取資料的同步爬蟲器 (Synchronous scraper used on cache misses)
+            ttl (float): 資料存活秒數 (Entry time-to-live in seconds)
+            refresh_interval (float): 背景檢查間隔秒數 (Background refresh check interval in seconds)
+            hot_window (float): 在此秒數內被讀取過的資料視為熱門 (Entries read within this many seconds are hot)
+            max_entries (int): 快取項目數上限 (Maximum number of cached entries)
+        """
+        if isinstance(scraper, AsyncETFScraper):
+            raise TypeError("ETFDataCache requires a synchronous ETFScraper")
+        self.scraper = scraper or ETFScraper()
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval
+        self.hot_window = hot_window
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._refresh_thread = None
+
+    def get(self, method: str, *args) -> Union[Dict, Dict[str, pd.DataFrame]]:
+        """
+        取得資料，未命中或過期時才向上游抓取
+        Get data, fetching upstream only on a miss or expired entry
+
+        Args:
+            method (str): METHODS 中的方法名稱 (Method name from METHODS)
+            *args: 方法參數，compare_etfs 為ETF代碼的 tuple (Method arguments, a tuple of codes for compare_etfs)
+
+        Returns:
+            Union[Dict, Dict[str, pd.DataFrame]]: 與 ETFScraper 對應方法相同 (Same as the ETFScraper method)
+        """
+        return self._get_entry(method, args)['value']
+
+    def get_json(self, method: str, *args) -> bytes:
+        """
+        取得資料的JSON內容
+        Get the JSON body of the data
+
+        Args:
+            method (str): METHODS 中的方法名稱 (Method name from METHODS)
+            *args: 方法參數 (Method arguments)
+
+        Returns:
+            bytes: UTF-8 編碼的JSON (UTF-8 encoded JSON)
+        """
+        entry = self._get_entry(method, args)
+        if entry['body'] is None:
+            entry['body'] = json.dumps(
+                _to_jsonable(entry['value']), ensure_ascii=False).encode('utf-8')
+        return entry['body']
+
+    def _get_entry(self, method: str, args: Tuple) -> Dict:
+        """
+        取得快取項目，並合併同一筆資料的並行請求
+        Get a cache entry, coalescing concurrent requests for the same key
+
+        Args:
+            method (str): 方法名稱 (Method name)
+            args (Tuple): 方法參數 (Method arguments)
+
+        Returns:
+            Dict: 快取項目 (Cache entry)
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Unsupported method: {method}")
+
+        key = (method, args)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry['expires_at'] > time.monotonic():
+                entry['last_access'] = time.monotonic()
+                self._entries.move_to_end(key)
+                return entry
+            future = self._inflight.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._inflight[key] = future
+
+        if not is_owner:
+            return future.result()
+
+        try:
+            entry = self._load(key)
+            entry['last_access'] = time.monotonic()
+            future.set_result(entry)
+            return entry
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def _load(self, key: Tuple[str, Tuple]) -> Dict:
+        """
+        向上游抓取資料並存入快取
+        Fetch data upstream and store it in the cache
+
+        Args:
+            key (Tuple[str, Tuple]): (方法名稱, 參數) ((method name, arguments))
+
+        Returns:
+            Dict: 新的快取項目 (New cache entry)
+        """
+        method, args = key
+        expires_at = time.monotonic() + self.ttl
+        if method == 'get_all_data':
+            # 由各頁面的快取組合，避免重複抓取 (Assembled from per-page entries to avoid refetching)
+            etf_code = args[0]
+            value = {}
+            for field in ('basic_info', 'holdings', 'risk_analysis',
+                          'return_comparison', 'return_trends'):
+                part = self._get_entry(f'get_{field}', (etf_code,))
+                value[field] = part['value']
+                expires_at = min(expires_at, part['expires_at'])
+        elif method == 'compare_etfs':
+            all_data = {}
+            for etf_code in args[0]:
+                try:
+                    part = self._get_entry('get_all_data', (etf_code,))
+                except Exception as e:
+                    print(f"Error getting data for {etf_code}: {e}")
+                    continue
+                all_data[etf_code] = part['value']
+                expires_at = min(expires_at, part['expires_at'])
+            value = self.scraper._build_comparison(all_data)
+        else:
+            value = getattr(self.scraper, method)(*args)
+
+        entry = {
+            'value': value,
+            'body': None,
+            'expires_at': expires_at,
+            'last_access': 0.0
+        }
+        with self._lock:
+            previous = self._entries.get(key)
+            if previous is not None:
+                entry['last_access'] = previous['last_access']
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def start_refresh(self) -> None:
+        """
+        啟動背景更新執行緒
+        Start the background refresh thread
+        """
+        if self._refresh_thread is not None and self._refresh_thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._refresh_thread = threading.Thread(target=self._refresh_loop, daemon=True)
+        self._refresh_thread.start()
+
+    def stop_refresh(self) -> None:
+        """
+        停止背景更新執行緒
+        Stop the background refresh thread
+        """
+        self._stop_event.set()
+        if self._refresh_thread is not None:
+            self._refresh_thread.join()
+            self._refresh_thread = None
+
+    def _evict_expired(self) -> None:
+        """
+        移除已過期且不熱門的資料
+        Evict entries that have expired and are not hot
+        """
+        now = time.monotonic()
+        with self._lock:
+            stale = [
+                key for key, entry in self._entries.items()
+                if entry['expires_at'] <= now and now - entry['last_access'] > self.hot_window
+            ]
+            for key in stale:
+                del self._entries[key]
+
+    def _refresh_loop(self) -> None:
+        """
+        定期重新抓取即將過期的熱門資料
+        Periodically refetch hot entries that are about to expire
+        """
+        while not self._stop_event.wait(self.refresh_interval):
+            self._evict_expired()
+            now = time.monotonic()
+            with self._lock:
+                due = [
+                    key for key, entry in self._entries.items()
+                    if now - entry['last_access'] <= self.hot_window
+                    and entry['expires_at'] - now <= self.refresh_interval * 2
+                ]
+            for key in due:
+                try:
+                    self._load(key)
+                except Exception as e:
+                    print(f"Error refreshing {key}: {e}")
+
+
+def _to_jsonable(obj):
+    """
+    將爬蟲結果轉為可JSON序列化的物件
+    Convert scraper results into JSON-serializable objects
+
+    Args:
+        obj: 爬蟲結果，可包含 DataFrame、日期與 NaN (Scraper result, may contain DataFrames, dates and NaN)
+
+    Returns:
+        可JSON序列化的物件 (JSON-serializable object)
+    """
+    if isinstance(obj, HoldingsHandle):
+        obj = obj.load()
+    if isinstance(obj, pd.DataFrame):
+        return [_to_jsonable(row) for row in obj.to_dict(orient='records')]
+    if isinstance(obj, dict):
+        return {str(key): _to_jsonable(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_to_jsonable(value) for value in obj]
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float) and obj != obj:  # NaN
+        return None
+    return obj
+
+
+class ETFRequestHandler(BaseHTTPRequestHandler):
+    """
+    ETF查詢服務的HTTP請求處理類別
+    HTTP Request Handler for the ETF Query Service
+
+    路由 (Routes):
+        GET /basic_info/<etf_code>
+        GET /holdings/<etf_code>
+        GET /risk_analysis/<etf_code>
+        GET /return_comparison/<etf_code>
+        GET /return_trends/<etf_code>
+        GET /all_data/<etf_code>
+        GET /compare_etfs?codes=00770.TW,QQQM
+    """
+
+    def do_GET(self) -> None:
+        parsed = urlparse(self.path)
+        parts = [unquote(part) for part in parsed.path.split('/') if part]
+
+        if parts == ['compare_etfs']:
+            codes = parse_qs(parsed.query).get('codes', [''])[0]
+            etf_codes = tuple(code for code in codes.split(',') if code)
+            if not etf_codes:
+                self._send_json(400, {'error': 'missing codes'})
+                return
+            self._send_cached('compare_etfs', etf_codes)
+        elif len(parts) == 2 and f'get_{parts[0]}' in ETFDataCache.METHODS:
+            self._send_cached(f'get_{parts[0]}', parts[1])
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def _send_cached(self, method: str, *args) -> None:
+        """
+        從快取取得資料並回應
+        Respond with data from the cache
+        """
+        try:
+            body = self.server.cache.get_json(method, *args)
+        except InvalidETFCode as e:
+            self._send_json(400, {'error': str(e)})
+            return
+        except Exception as e:
+            self._send_json(502, {'error': str(e)})
+            return
+        self._send_body(200, body)
+
+    def _send_json(self, status: int, obj: Dict) -> None:
+        self._send_body(status, json.dumps(obj, ensure_ascii=False).encode('utf-8'))
+
+    def _send_body(self, status: int, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        # 命中快取的請求很多，不逐筆輸出 (Hits are frequent, so don't log every request)
+        pass
+
+
+def serve(host: str = '127.0.0.1', port: int = 8000,
+          cache: Optional[ETFDataCache] = None) -> None:
+    """
+    啟動本機ETF查詢服務，直到中斷為止
+    Run the local ETF query service until interrupted
+
+    Args:
+        host (str): 監聽位址 (Listen address)
+        port (int): 監聽埠號 (Listen port)
+        cache (Optional[ETFDataCache]): 共用快取，預設建立新的 (Shared cache, a new one by default)
+    """
+    server = ThreadingHTTPServer((host, port), ETFRequestHandler)
+    server.cache = cache or ETFDataCache()
+    server.cache.start_refresh()
+    print(f"Serving ETF data on http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.cache.stop_refresh()
+        server.server_close()
+
+
+# # 使用範例 (Usage Example)
+# if __name__ == "__main__":
+#     # 建立爬蟲器實例 (Create scraper instance)
+#     scraper = ETFScraper()
+
+#     # 指定要查詢的ETF代碼 (Specify ETF code to query)
+#     etf_code = 'VT'
+
+#     # 獲取所有數據 (Get all data)
+#     data = scraper.get_all_data(etf_code)
+
+#     # 顯示基本資訊 (Display basic information)
+#     print("\n基本資訊 (Basic Information):")
+#     print(pd.DataFrame([data['basic_info']]))
+
+#     # 顯示持股資訊 (Display holdings information)
+#     print("\n持股資訊 (Holdings Information):")
+#     holdings = data.get('holdings', {})
+#     for holding_type in ['holdings_by_region', 'holdings_by_sector', 'top_holdings']:
+#         df = holdings.get(holding_type)
+#         if df is not None and not df.empty:
+#             print(f"\n{holding_type}:")
+#             print(df)
+#         else:
+#             print(f"\n{holding_type}: 無資料 (No data)")
+
+#     # 顯示風險分析 (Display risk analysis)
+#     print("\n風險分析 (Risk Analysis):")
+#     print(pd.DataFrame(data['risk_analysis']).T)
+
+#     # 顯示報酬比較 (Display return comparison)
+#     print("\n報酬比較 (Return Comparison):")
+#     if 'comparison' in data['return_comparison']:
+#         print(data['return_comparison']['comparison'])
+
+#     # 顯示月份報酬比較 (Display monthly return comparison)
+#     print("\n月份報酬比較 (Monthly Return Comparison):")
+#     if 'monthly' in data['return_comparison']:
+#         print(data['return_comparison']['monthly'])
+
+#     # 顯示報酬走勢 (Display return trends)
+#     print("\n報酬走勢 (Return Trends):")
+#     print("月報酬率 (Monthly Returns):")
+#     print(data['return_trends']['monthly_return'])
+#     print("\n季報酬率 (Quarterly Returns):")
+#     print(data['return_trends']['quarterly_return'])
+#     print("\n年報酬率 (Yearly Returns):")
+#     print(data['return_trends']['yearly_return'])
+
+# 使用示例 (Usage Example)
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        serve(port=int(sys.argv[2]) if len(sys.argv) > 2 else 8000)
+        sys.exit(0)
 
-# 使用示例 (Usage Example)
-if __name__ == "__main__":
     scraper = ETFScraper()
 
     # 指定要比較的ETF代碼
@@ -0,0 +1,12 @@
+import importlib.util
+import os
+import sys
+
+# moneydj-scraper.py 檔名含連字號，無法直接 import (The hyphenated file name cannot be imported directly)
+_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'moneydj-scraper.py')
+
+if 'moneydj_scraper' not in sys.modules:
+    _spec = importlib.util.spec_from_file_location('moneydj_scraper', _PATH)
+    _module = importlib.util.module_from_spec(_spec)
+    sys.modules['moneydj_scraper'] = _module
+    _spec.loader.exec_module(_module)
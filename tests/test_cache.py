@@ -0,0 +1,134 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+
+import moneydj_scraper as mds
+
+
+class CountingTransport(mds.Transport):
+    """SyntheticTransport wrapper that counts fetches and can stall them."""
+
+    def __init__(self, delay=0.0):
+        self.inner = mds.SyntheticTransport(10)
+        self.delay = delay
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def fetch(self, url):
+        with self._lock:
+            self.calls.append(url)
+        time.sleep(self.delay)
+        return self.inner.fetch(url)
+
+
+class FailingTransport(mds.Transport):
+    def fetch(self, url):
+        raise ValueError("upstream page could not be parsed")
+
+
+def make_cache(delay=0.0, **kwargs):
+    transport = CountingTransport(delay)
+    return mds.ETFDataCache(mds.ETFScraper(transport), **kwargs), transport
+
+
+def test_concurrent_misses_fetch_once():
+    cache, transport = make_cache(delay=0.2)
+    results = []
+
+    def worker():
+        results.append(cache.get('get_basic_info', 'SYN00001'))
+
+    threads = [threading.Thread(target=worker) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(transport.calls) == 1
+    assert len(results) == 20
+    assert all(result is results[0] for result in results)
+
+
+def test_composite_entries_expire_with_earliest_page():
+    cache, transport = make_cache(ttl=300)
+    cache.get('get_basic_info', 'SYN00001')
+    earliest = time.monotonic() + 5
+    cache._entries[('get_basic_info', ('SYN00001',))]['expires_at'] = earliest
+
+    cache.get('get_all_data', 'SYN00001')
+    cache.get('compare_etfs', ('SYN00001', 'SYN00002'))
+
+    assert cache._entries[('get_all_data', ('SYN00001',))]['expires_at'] == earliest
+    assert cache._entries[('compare_etfs', (('SYN00001', 'SYN00002'),))]['expires_at'] == earliest
+    # 組合資料重用頁面快取 (Composite entries reuse the cached pages)
+    assert len(transport.calls) == 10
+
+
+def test_least_recently_used_entries_are_dropped():
+    cache, _ = make_cache(max_entries=2)
+    cache.get('get_basic_info', 'SYN00001')
+    cache.get('get_basic_info', 'SYN00002')
+    cache.get('get_basic_info', 'SYN00001')
+    cache.get('get_basic_info', 'SYN00003')
+
+    assert list(cache._entries) == [('get_basic_info', ('SYN00001',)),
+                                    ('get_basic_info', ('SYN00003',))]
+
+
+def test_expired_cold_entries_are_evicted():
+    cache, _ = make_cache(hot_window=60)
+    cache.get('get_basic_info', 'SYN00001')
+    cache.get('get_basic_info', 'SYN00002')
+    now = time.monotonic()
+    for entry in cache._entries.values():
+        entry['expires_at'] = now - 1
+    cache._entries[('get_basic_info', ('SYN00001',))]['last_access'] = now - 120
+
+    cache._evict_expired()
+
+    assert list(cache._entries) == [('get_basic_info', ('SYN00002',))]
+
+
+def test_cache_rejects_async_scraper():
+    scraper = mds.AsyncETFScraper(transport=mds.SyntheticTransport(1))
+    try:
+        mds.ETFDataCache(scraper)
+    except TypeError:
+        return
+    raise AssertionError("ETFDataCache accepted an async scraper")
+
+
+def test_build_url_escapes_code():
+    url = mds.ETFScraper()._build_url('basic_info', 'VT&x=1/../#')
+    assert url.endswith('etfid=VT%26x%3D1%2F..%2F%23')
+
+
+def request_status(cache, path):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), mds.ETFRequestHandler)
+    server.cache = cache
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        url = f'http://127.0.0.1:{server.server_port}{path}'
+        try:
+            with urllib.request.urlopen(url) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_invalid_code_is_400_and_upstream_errors_are_502(tmp_path):
+    scraper = mds.ETFScraper(CountingTransport(), holdings_dir=str(tmp_path))
+    status, body = request_status(mds.ETFDataCache(scraper), '/holdings/%2E%2E')
+    assert status == 400
+    assert 'Invalid ETF code' in body['error']
+
+    status, body = request_status(mds.ETFDataCache(mds.ETFScraper(FailingTransport())),
+                                  '/basic_info/VT')
+    assert status == 502
@@ -0,0 +1,96 @@
+import os
+
+import pandas as pd
+import pytest
+
+import moneydj_scraper as mds
+
+TABLE_ID = 'ctl00_ctl00_MainContent_MainContent_stable3'
+
+
+def holdings_page(rows, title='主要持股明細'):
+    body = ''.join(
+        f'<tr><td>{name}</td><td>{weight}</td><td>{shares}</td></tr>'
+        for name, weight, shares in rows
+    )
+    return (
+        '<html><body>'
+        f'<div class="eTitle">{title}</div>'
+        f'<table id="{TABLE_ID}"><tr><th>個股名稱</th><th>投資比例(%)</th><th>持有股數</th></tr>'
+        f'{body}</table>'
+        '</body></html>'
+    )
+
+
+class PageTransport(mds.Transport):
+    def __init__(self, html):
+        self.html = html
+
+    def fetch(self, url):
+        return self.html
+
+
+def both_modes(html, tmp_path, **kwargs):
+    normal = mds.ETFScraper(PageTransport(html)).get_holdings('VT')
+    bounded = mds.ETFScraper(PageTransport(html), holdings_dir=str(tmp_path),
+                             chunk_size=2, **kwargs).get_holdings('VT')
+    return normal, bounded
+
+
+def test_bounded_matches_normal_with_line_breaks_in_names(tmp_path):
+    rows = [('Apple\r\nInc', '5.5', '1,000'), ('Line\rBreak', '2.25', '20'),
+            ('Tab\there', '1', '3'), ('"Quoted" \\ name', '0.5', '4'),
+            ('台積電', '0.25', '5,000')]
+    normal, bounded = both_modes(holdings_page(rows), tmp_path)
+
+    assert isinstance(bounded['top_holdings'], mds.HoldingsHandle)
+    pd.testing.assert_frame_equal(bounded['top_holdings'].load(), normal['top_holdings'])
+    chunks = list(bounded['top_holdings'].iter_chunks(2))
+    pd.testing.assert_frame_equal(pd.concat(chunks, ignore_index=True), normal['top_holdings'])
+    assert normal['top_holdings']['個股名稱'][0] == 'Apple\r\nInc'
+
+
+def test_table_without_title_is_ignored_in_both_modes(tmp_path):
+    html = holdings_page([('Apple', '5', '1')], title='其他')
+    normal, bounded = both_modes(html, tmp_path)
+
+    assert normal['top_holdings'] is None
+    assert bounded['top_holdings'] is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_old_versions_are_pruned_unless_in_use(tmp_path):
+    scraper = mds.ETFScraper(PageTransport(holdings_page([('Apple', '5', '1')])),
+                             holdings_dir=str(tmp_path), keep_versions=2)
+    held = scraper.get_holdings('VT')['top_holdings']
+    for _ in range(3):
+        scraper.get_holdings('VT')
+    versions = [name for name in os.listdir(tmp_path / 'VT') if name != 'CURRENT']
+
+    assert len(versions) == 3
+    assert os.path.basename(held.path) in versions
+    assert len(held.load()) == 1
+
+    del held
+    scraper.get_holdings('VT')
+    versions = [name for name in os.listdir(tmp_path / 'VT') if name != 'CURRENT']
+    assert len(versions) == 2
+
+
+class FailingTransport(mds.Transport):
+    def fetch(self, url):
+        raise ConnectionError("offline")
+
+
+def test_failed_fetch_creates_no_directory(tmp_path):
+    scraper = mds.ETFScraper(FailingTransport(), holdings_dir=str(tmp_path))
+    with pytest.raises(ConnectionError):
+        scraper.get_holdings('VT')
+    assert os.listdir(tmp_path) == []
+
+
+def test_escaping_codes_are_rejected(tmp_path):
+    scraper = mds.ETFScraper(PageTransport(holdings_page([])), holdings_dir=str(tmp_path / 'h'))
+    for code in ('', '.', '..'):
+        with pytest.raises(mds.InvalidETFCode):
+            scraper.get_holdings(code)
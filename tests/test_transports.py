@@ -0,0 +1,28 @@
+import asyncio
+import threading
+
+import moneydj_scraper as mds
+
+
+class ThreadRecordingTransport(mds.SyntheticTransport):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.render_threads = []
+
+    def _render(self, url):
+        self.render_threads.append(threading.current_thread())
+        return super()._render(url)
+
+
+def test_simulated_fetch_async_renders_off_the_loop():
+    transport = ThreadRecordingTransport(2, latency=0.01)
+
+    async def fetch():
+        scraper = mds.AsyncETFScraper(transport=transport)
+        return await scraper.get_basic_info('SYN00001')
+
+    info = asyncio.run(fetch())
+
+    assert info['ETF名稱']
+    assert transport.render_threads
+    assert threading.main_thread() not in transport.render_threads